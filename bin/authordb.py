@@ -3,14 +3,15 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
 import os
 import re
 import unicodedata
 from typing import Annotated, Self
 
-import yaml
 from db2authors import latex2text
 from pydantic import AfterValidator, BaseModel, ConfigDict, Field, model_validator
+from yamltools import dump_yaml, load_yaml_snapshot
 
 
 def strip_utf(ins: str) -> str:
@@ -39,11 +40,16 @@ def load_authordb(file_name: str | None = None) -> AuthorDbYaml:
         exedir = os.path.abspath(os.path.dirname(__file__))
         authordb_path = os.path.normpath(os.path.join(exedir, os.path.pardir, "etc", "authordb.yaml"))
 
-    with open(authordb_path) as adbfile:
-        authordb_yaml = yaml.safe_load(adbfile)
-        print(f"Parsing into AuthorDbYaml object from {authordb_path}")
-        adb = AuthorDbYaml.model_validate(authordb_yaml, strict=True)
-    return adb
+    print(f"Parsing into AuthorDbYaml object from {authordb_path}")
+    # The validated model is kept in a snapshot next to the file. Any change
+    # to this module could change the validation so invalidates it.
+    with open(__file__, "rb") as fd:
+        source = hashlib.sha256(fd.read()).hexdigest()
+    return load_yaml_snapshot(
+        authordb_path,
+        f"{__name__}.AuthorDbYaml:{source}",
+        lambda authordb_yaml: AuthorDbYaml.model_validate(authordb_yaml, strict=True),
+    )
 
 
 def dump_authordb(adb: AuthorDbYaml, file_name: str | None = None) -> str:
@@ -59,7 +65,7 @@ def dump_authordb(adb: AuthorDbYaml, file_name: str | None = None) -> str:
 
     with open(authordb_path, "w") as adbfile:
         print(f"Writing AuthorDbYaml object to {authordb_path}...\n")
-        yaml.safe_dump(adb.model_dump(), adbfile, allow_unicode=True)
+        dump_yaml(adb.model_dump(), adbfile, allow_unicode=True)
     return authordb_path
 
 
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+"""Benchmark the acronym matching in generateAcronyms.py.
+
+The `AcronymMatcher` pass is compared against the original implementation,
+one large alternation regular expression followed by a ``re.sub`` per
+matched term, both for speed and to check that the ``matches`` and
+``missing`` sets are identical.
+
+With ``--update`` the `GlsRewriter` used by ``generateAcronyms.py -u`` is
+compared against `sub_line`, which runs a regular expression per glossary
+term on every line, and the rewritten lines are checked to be identical.
+
+Run from the top of the repository::
+
+    python bin/benchmarks/bench_acronyms.py examples/*.tex
+"""
+
+import argparse
+import os.path
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.path.pardir))
+
+import glossarytools  # noqa: E402
+from glossarytools import (  # noqa: E402
+    CAP_ACRONYM,
+    AcronymMatcher,
+    GlsRewriter,
+    find_matches_text,
+    is_nonstandard,
+    make_regexmap,
+    read_glossarydef,
+    read_tex_text,
+    setup_paths,
+    sub_line,
+)
+
+
+def legacy_find_matches_text(text: str, acronyms: set[str]) -> tuple[set[str], set[str]]:
+    """Match acronyms the way find_matches_combo did before the matcher."""
+    nonstandard = {a for a in acronyms if is_nonstandard(a)}
+    sorted_nonstandard = sorted(nonstandard, key=len, reverse=True)
+    pattern = r"\b(" + "|".join(re.escape(w) for w in sorted_nonstandard) + r")\b"
+    regex = re.compile(pattern)
+
+    matches = set(regex.findall(text))
+    for m in sorted(matches, key=len, reverse=True):
+        text = re.sub(rf"\b{re.escape(m)}\b", "", text)
+
+    used = set(CAP_ACRONYM.findall(text))
+    gls = set()
+    if glossarytools.doGlossary:
+        gls = set(re.findall(r"ls{([\w ]+)}", text))
+        used.update(gls)
+    matches.update(used & acronyms)
+    matches.update(gls & acronyms)
+    return matches, used - matches
+
+
+def best_of(repeat: int, func, *args):  # type: ignore[no-untyped-def]
+    """Return the result and the fastest time of ``repeat`` calls."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func(*args)
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def legacy_update(lines: list[str], GLSlist: list[str]) -> list[str]:
+    """Rewrite lines the way updateFile did before the rewriter."""
+    regexmap = make_regexmap(GLSlist)
+    return [sub_line(line, regexmap, GLSlist) for line in lines]
+
+
+def rewriter_update(lines: list[str], GLSlist: list[str]) -> list[str]:
+    """Rewrite lines with a GlsRewriter."""
+    rewriter = GlsRewriter(GLSlist)
+    return [rewriter.sub_line(line) for line in lines]
+
+
+def bench_update(files: list[str], repeat: int) -> int:
+    r"""Compare rewriting of lines with \gls, return the exit status."""
+    GLSlist = list(read_glossarydef(setup_paths()[0], set()))
+    lines: list[str] = []
+    for filename in files:
+        with open(filename) as fd:
+            lines.extend(fd)
+    print(f"{len(GLSlist)} terms, {len(lines)} lines")
+
+    legacy, legacy_time = best_of(repeat, legacy_update, lines, GLSlist)
+    current, current_time = best_of(repeat, rewriter_update, lines, GLSlist)
+
+    print(f"legacy sub_line: {legacy_time:8.4f}s")
+    print(f"rewriter:        {current_time:8.4f}s")
+    different = [i for i, (a, b) in enumerate(zip(legacy, current, strict=True)) if a != b]
+    if different:
+        print(f"MISMATCH on {len(different)} lines")
+        for i in different[:10]:
+            print(f"  legacy:   {legacy[i]!r}")
+            print(f"  rewriter: {current[i]!r}")
+        return 1
+    print(f"identical: {sum(a != b for a, b in zip(lines, current, strict=True))} lines changed")
+    return 0
+
+
+def main() -> int:
+    """Run the benchmark and return the exit status."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("files", metavar="FN", nargs="+", help="tex files to scan")
+    parser.add_argument("-g", "--glossary", action="store_true", help="Include glossary entries.")
+    parser.add_argument("-u", "--update", action="store_true", help="Benchmark adding \\gls to files.")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Number of timing repeats.")
+    args = parser.parse_args()
+    glossarytools.doGlossary = args.glossary
+    if args.update:
+        return bench_update(args.files, args.repeat)
+
+    acronyms = set(read_glossarydef(setup_paths()[0], set()))
+    text = " ".join(read_tex_text(f) for f in args.files)
+    print(f"{len(acronyms)} terms, {len(text)} characters of text")
+
+    legacy, legacy_time = best_of(args.repeat, legacy_find_matches_text, text, acronyms)
+    nonstandard = [a for a in acronyms if is_nonstandard(a)]
+    matcher, build_time = best_of(args.repeat, AcronymMatcher, nonstandard)
+    current, current_time = best_of(args.repeat, find_matches_text, text, acronyms, matcher)
+
+    print(f"legacy regex:    {legacy_time:8.4f}s")
+    print(f"matcher build:   {build_time:8.4f}s")
+    print(f"matcher scan:    {current_time:8.4f}s")
+    if current != legacy:
+        print("MISMATCH")
+        print(f"  only legacy:  matches={legacy[0] - current[0]} missing={legacy[1] - current[1]}")
+        print(f"  only matcher: matches={current[0] - legacy[0]} missing={current[1] - legacy[1]}")
+        return 1
+    print(f"identical: {len(current[0])} matches, {len(current[1])} missing")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+
+"""Time and count the allocations of resolving every author.
+
+Every author in :file:`etc/authordb.yaml` is resolved with
+`AuthorFactory.get_author` and their affiliations numbered, as the
+generators do, starting from a new factory each time. This is done with
+the factory, which builds each affiliation once and shares it, and with a
+copy of it that builds a new affiliation for every lookup as it used to.
+For each the time, the memory allocated and the number of distinct
+affiliation instances are reported.
+
+Run from the top of the repository::
+
+    python bin/benchmarks/bench_affiliations.py -r 5 -o affiliations.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from typing import Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.path.pardir))
+
+from db2authors import Affiliation, AuthorFactory, LsstDoc  # noqa: E402
+from yamltools import load_yaml  # noqa: E402
+
+BIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir)
+AUTHORDB = os.path.join(BIN, os.path.pardir, "etc", "authordb.yaml")
+
+
+class RebuildingFactory(AuthorFactory):
+    """Factory building a new affiliation for every lookup."""
+
+    def get_affiliation(self, affiliationid: str) -> Affiliation:
+        return self._build_affiliation(affiliationid)
+
+
+def resolve(factory_class: type[AuthorFactory], authordb: dict[str, Any]) -> int:
+    """Resolve all the authors and return the number of distinct
+    affiliation instances they have.
+    """
+    factory = factory_class.from_authordb(authordb)
+    # Ignore the warnings about missing email addresses.
+    with contextlib.redirect_stderr(io.StringIO()):
+        authors = [factory.get_author(authorid) for authorid in factory.get_author_ids()]
+    LsstDoc(authors).number_affiliations()
+    return len({id(affil) for author in authors for affil in author.affiliations})
+
+
+def measure(
+    name: str, repeat: int, factory_class: type[AuthorFactory], authordb: dict[str, Any]
+) -> dict[str, Any]:
+    """Print and return the time, allocations and instances of resolving
+    all the authors.
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        resolve(factory_class, authordb)
+        times.append(time.perf_counter() - start)
+    tracemalloc.start()
+    instances = resolve(factory_class, authordb)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{name:12s} {min(times):9.4f}s {peak / 1024:10.0f}KiB {instances:10d}")
+    return {
+        "name": name,
+        "best": min(times),
+        "median": statistics.median(times),
+        "times": times,
+        "peak_bytes": peak,
+        "affiliation_instances": instances,
+    }
+
+
+def main() -> int:
+    """Run the benchmark and return the exit status."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Number of runs of each stage.")
+    parser.add_argument("-o", "--output", help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    with open(AUTHORDB) as fd:
+        authordb = load_yaml(fd)
+    print(f"{len(authordb['authors'])} authors, {len(authordb['affiliations'])} affiliations")
+    print(f"{'factory':12s} {'time':>10s} {'peak':>13s} {'instances':>10s}")
+    results = [
+        measure("rebuilding", args.repeat, RebuildingFactory, authordb),
+        measure("shared", args.repeat, AuthorFactory, authordb),
+    ]
+
+    if args.output:
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "results": results,
+        }
+        with open(args.output, "w") as fd:
+            json.dump(report, fd, indent=2)
+            fd.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+
+"""Time ``make authors.csv``, the csvall mode of db2authors.py.
+
+Two sets of times are reported. The first is the whole command, run as a
+separate process in a temporary directory as the Makefile runs it, for
+db2authors.py and, given ``--script``, another copy of it such as one from
+an earlier release. The second is the conversion of every name and
+affiliation in :file:`etc/authordb.yaml` from LaTeX to plain text:
+
+- ``new converter per string``: as db2authors.py used to, building a
+  converter for every string.
+- ``latex2text``: one converter shared by all strings, as now.
+- ``latex2text_many``: the same, in ``-j`` processes.
+
+Last is the aas7 author list for every author, rendered in this process
+and in ``-j`` processes.
+
+Converted strings are forgotten between runs so every string is converted
+each time.
+
+Run from the top of the repository::
+
+    python bin/benchmarks/bench_authors.py -r 3 -j 4 -o authors.json
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from typing import Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.path.pardir))
+
+import db2authors  # noqa: E402
+from db2authors import AASTeX7, Author, AuthorFactory, latex2text, latex2text_many  # noqa: E402
+from yamltools import load_yaml  # noqa: E402
+
+BIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir)
+AUTHORDB = os.path.join(BIN, os.path.pardir, "etc", "authordb.yaml")
+
+
+def time_command(command: list[str], repeat: int) -> list[float]:
+    """Return the time of each of ``repeat`` runs of a command."""
+    times = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run(command, cwd=workdir, check=True, capture_output=True)
+            times.append(time.perf_counter() - start)
+    return times
+
+
+def time_conversion(repeat: int, func: Callable[[], object]) -> list[float]:
+    """Return the time of each of ``repeat`` calls of ``func``, forgetting
+    the strings converted before each.
+    """
+    times = []
+    for _ in range(repeat):
+        db2authors._plain_text.clear()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def database_strings() -> tuple[list[Author], list[str]]:
+    """Return all the authors and the LaTeX strings that csvall
+    converts.
+    """
+    with open(AUTHORDB) as fd:
+        factory = AuthorFactory.from_authordb(load_yaml(fd))
+    # Ignore the warning about missing email addresses.
+    with contextlib.redirect_stderr(io.StringIO()):
+        authors = factory.get_authors(factory.get_author_ids())
+    strings: list[str] = []
+    for author in authors:
+        strings.extend((author.full_latex_name, author.given_name, author.family_name))
+    for affilid in factory.get_affiliation_ids():
+        strings.append(factory.get_affiliation(affilid).get_full_address_with_institute())
+    return authors, strings
+
+
+def summarize(name: str, times: list[float]) -> dict[str, Any]:
+    """Print and return the best and median of some times."""
+    print(f"{name:28s} {min(times):9.4f}s")
+    return {"name": name, "best": min(times), "median": statistics.median(times), "times": times}
+
+
+def main() -> int:
+    """Run the benchmark and return the exit status."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--script", help="Another db2authors.py to time csvall for.")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Number of runs of each stage.")
+    parser.add_argument("-j", "--jobs", type=int, default=4, help="Processes for latex2text_many.")
+    parser.add_argument("-o", "--output", help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    results = []
+    scripts = {"db2authors.py -m csvall": os.path.join(BIN, "db2authors.py")}
+    if args.script:
+        scripts[f"{args.script} -m csvall"] = os.path.abspath(args.script)
+    for name, script in scripts.items():
+        results.append(summarize(name, time_command([sys.executable, script, "-m", "csvall"], args.repeat)))
+
+    from pylatexenc.latex2text import LatexNodes2Text
+
+    authors, strings = database_strings()
+    print(f"{len(strings)} strings, {len(set(strings))} distinct")
+    results.append(
+        summarize(
+            "new converter per string",
+            time_conversion(args.repeat, lambda: [LatexNodes2Text().latex_to_text(s) for s in strings]),
+        )
+    )
+    results.append(
+        summarize("latex2text", time_conversion(args.repeat, lambda: [latex2text(s) for s in strings]))
+    )
+    results.append(
+        summarize(
+            f"latex2text_many[{args.jobs}]",
+            time_conversion(args.repeat, lambda: latex2text_many(strings, args.jobs)),
+        )
+    )
+    results.append(
+        summarize("AASTeX7 generate", time_conversion(args.repeat, lambda: AASTeX7(authors).generate()))
+    )
+    results.append(
+        summarize(
+            f"AASTeX7 generate[{args.jobs}]",
+            time_conversion(args.repeat, lambda: AASTeX7(authors, args.jobs).generate()),
+        )
+    )
+
+    if args.output:
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "jobs": args.jobs,
+            "strings": len(strings),
+            "results": results,
+        }
+        with open(args.output, "w") as fd:
+            json.dump(report, fd, indent=2)
+            fd.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+
+"""Time how long generateAcronyms.py takes to start in each mode.
+
+Each mode is run as a separate process, as it would be from a Makefile, and
+two times are recorded: from starting the process to its first output, and
+to its exit. The time to run an empty Python script is given for
+reference. The runs are made in a temporary directory holding a copy of
+an example document, with a cache directory of their own. Every mode is
+run once before timing starts so that the caches, and the compiled
+bytecode of imported modules, are filled as they would be when a document
+is rebuilt.
+
+The scripts of a baseline revision, ``main`` unless given with
+``--baseline``, are checked out with ``git archive`` and timed next to
+those in the working tree, so that a change in startup time shows up.
+
+Run from the top of the repository::
+
+    python bin/benchmarks/bench_startup.py -r 10 -o startup.json
+"""
+
+import argparse
+import io
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tarfile
+import tempfile
+import time
+from typing import Any
+
+BIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir)
+TOP = os.path.join(BIN, os.path.pardir)
+EXAMPLE = os.path.join(TOP, "examples", "DMTN-nnn.tex")
+
+MODES = {
+    "help": ["-h"],
+    "dump": ["-d", "glstab.tex"],
+    "check": ["-c", "glstab.tex"],
+    "table": ["DMTN-nnn.tex"],
+    "glossary": ["-g", "DMTN-nnn.tex"],
+    "update": ["-u", "DMTN-nnn.tex"],
+}
+
+
+def time_run(command: list[str], cwd: str) -> tuple[float, float]:
+    """Return the time to the first output and to the exit of a command."""
+    env = dict(os.environ, XDG_CACHE_HOME=os.path.join(cwd, "cache"))
+    # Compiled modules are kept, as they are for most users.
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    start = time.perf_counter()
+    with subprocess.Popen(
+        command, cwd=cwd, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+    ) as proc:
+        assert proc.stdout is not None
+        proc.stdout.read(1)
+        first = time.perf_counter() - start
+        proc.stdout.read()
+        proc.wait()
+    total = time.perf_counter() - start
+    if proc.returncode:
+        raise RuntimeError(f"{' '.join(command)} failed with status {proc.returncode}")
+    return first, total
+
+
+def checkout(revision: str, directory: str) -> str:
+    """Write the scripts and data of a revision to a directory and return
+    the path of its generateAcronyms.py.
+    """
+    archive = subprocess.run(
+        ["git", "-C", TOP, "archive", revision, "bin", "etc"], capture_output=True, check=True
+    ).stdout
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(directory, filter="data")
+    return os.path.join(directory, "bin", "generateAcronyms.py")
+
+
+def time_script(script: str, modes: list[str], workdir: str, repeat: int) -> dict[str, dict[str, Any]]:
+    """Return the times of running a script in each mode."""
+    shutil.copy(EXAMPLE, workdir)
+    commands = {"python": [sys.executable, "-c", "print()"]}
+    for mode in modes:
+        commands[mode] = [sys.executable, script, *MODES[mode]]
+    # The update mode needs a glossary to read.
+    time_run([sys.executable, script, *MODES["glossary"]], workdir)
+    for command in commands.values():
+        time_run(command, workdir)
+
+    results = {}
+    for name, command in commands.items():
+        firsts, totals = [], []
+        for _ in range(repeat):
+            first, total = time_run(command, workdir)
+            firsts.append(first)
+            totals.append(total)
+        results[name] = {"first_output": summarize(firsts), "exit": summarize(totals)}
+    return results
+
+
+def summarize(times: list[float]) -> dict[str, Any]:
+    """Return the best and median of some times."""
+    return {"best": min(times), "median": statistics.median(times), "times": times}
+
+
+def main() -> int:
+    """Run the benchmark and return the exit status."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--baseline", default="main", help="Git revision to compare with.")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Number of runs of each mode.")
+    parser.add_argument("-m", "--mode", action="append", choices=MODES, help="Mode to time, default all.")
+    parser.add_argument("-o", "--output", help="Write the results to this JSON file.")
+    args = parser.parse_args()
+    modes = args.mode or list(MODES)
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        scripts = {
+            "baseline": checkout(args.baseline, os.path.join(tmpdir, "baseline")),
+            "current": os.path.join(BIN, "generateAcronyms.py"),
+        }
+        timings = {}
+        for tree, script in scripts.items():
+            workdir = os.path.join(tmpdir, f"run-{tree}")
+            os.mkdir(workdir)
+            timings[tree] = time_script(script, modes, workdir, args.repeat)
+
+    print(f"{'':10s} {'first output':>32s} {'exit':>32s}")
+    print(f"{'mode':10s}" + f" {'baseline':>10s} {'current':>10s} {'change':>10s}" * 2)
+    results = []
+    for name in timings["current"]:
+        line = f"{name:10s}"
+        for stage in ("first_output", "exit"):
+            before = timings["baseline"][name][stage]["best"]
+            after = timings["current"][name][stage]["best"]
+            line += f" {before:9.4f}s {after:9.4f}s {after / before - 1:+10.0%}"
+        print(line)
+        args_ = [] if name == "python" else MODES[name]
+        results.append({"name": name, "args": args_, **{tree: timings[tree][name] for tree in timings}})
+
+    if args.output:
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "baseline": args.baseline,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "results": results,
+        }
+        with open(args.output, "w") as fd:
+            json.dump(report, fd, indent=2)
+            fd.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
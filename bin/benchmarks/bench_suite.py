@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+
+r"""Time the stages of generateAcronyms.py on a synthetic corpus.
+
+A corpus is generated with `make_corpus` (or an existing set of TeX files is
+used) and each stage is timed on it:
+
+- ``GlossaryStore.from_csv``: parse :file:`etc/glossarydefs.csv`.
+- ``read_glossarydef``: select the definitions for the tags.
+- ``find_matches_combo``: find the terms used in each file without pandoc.
+- ``find_matches_combo[pandoc]``: the same via pandoc, if it is installed.
+- ``converge_glossary``: find the terms used by the definitions of the
+  terms found. This replaced ``forceConverge``.
+- ``update_gls_entries``: add ``\gls`` to the definitions.
+- ``updateFile``: add ``\gls`` to each file, as ``-u`` does.
+
+The results are written as JSON so runs from different releases can be
+compared. Given ``--baseline`` the stages are compared against an earlier
+results file and the exit status is non-zero if any is slower than
+``--tolerance`` times the baseline.
+
+Run from the top of the repository::
+
+    python bin/benchmarks/bench_suite.py --files 20 --lines 2000 -o bench.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from typing import Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.path.pardir))
+
+import glossarytools  # noqa: E402
+from glossarytools import (  # noqa: E402
+    GlossaryStore,
+    GlsRewriter,
+    converge_glossary,
+    find_matches_combo,
+    load_glossary_index,
+    read_glossarydef,
+    setup_paths,
+    update_gls_entries,
+    updateFile,
+)
+from make_corpus import make_corpus  # noqa: E402
+
+RESULTS_VERSION = 1
+
+
+def time_stage(
+    repeat: int, func: Callable[[], object], setup: Callable[[], object] | None = None
+) -> list[float]:
+    """Return the time of each of ``repeat`` calls of ``func``.
+
+    ``setup``, if given, is called untimed before each call.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def git_revision() -> str | None:
+    """Return the commit of the repository being benchmarked, if known."""
+    try:
+        result = subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return result.stdout.strip()
+
+
+def run_suite(texfiles: list[str], repeat: int, utags: set[str]) -> list[dict[str, Any]]:
+    """Time each stage on the given files and return the results."""
+    results: list[dict[str, Any]] = []
+
+    def record(name: str, times: list[float] | None, skipped: str | None = None) -> None:
+        entry: dict[str, Any] = {"name": name}
+        if times is None:
+            entry["skipped"] = skipped
+            print(f"{name:28s}  skipped ({skipped})")
+        else:
+            entry.update(best=min(times), mean=sum(times) / len(times), times=times)
+            print(f"{name:28s} {min(times):9.4f}s")
+        results.append(entry)
+
+    glossary_path = setup_paths()[0]
+    record("GlossaryStore.from_csv", time_stage(repeat, lambda: GlossaryStore.from_csv(glossary_path)))
+    record("read_glossarydef", time_stage(repeat, lambda: read_glossarydef(glossary_path, utags)))
+
+    index = load_glossary_index(utags)
+
+    def scan() -> set[str]:
+        terms: set[str] = set()
+        for filename in texfiles:
+            terms.update(find_matches_combo(filename, index.acronyms, matcher=index.matcher)[0])
+        return terms
+
+    record("find_matches_combo", time_stage(repeat, scan))
+    terms = scan()
+
+    saved = glossarytools.USE_PANDOC
+    glossarytools.USE_PANDOC = True
+    try:
+        if glossarytools.get_pypandoc() is None:
+            record("find_matches_combo[pandoc]", None, "pandoc not available")
+        else:
+            record("find_matches_combo[pandoc]", time_stage(repeat, scan))
+    finally:
+        glossarytools.USE_PANDOC = saved
+
+    record("converge_glossary", time_stage(repeat, lambda: converge_glossary(terms, index, True)))
+
+    entries, _ = converge_glossary(terms, index, True)
+    record(
+        "update_gls_entries",
+        time_stage(repeat, lambda: update_gls_entries(entries, index.lsst_definitions)),
+    )
+
+    # As for -u the terms are the entries in the glossary.
+    glslist = {acr for acr, _ in entries}
+    with tempfile.TemporaryDirectory() as workdir:
+        copies = [os.path.join(workdir, os.path.basename(f)) for f in texfiles]
+
+        def restore() -> None:
+            for filename, copy in zip(texfiles, copies, strict=True):
+                shutil.copyfile(filename, copy)
+
+        def update() -> None:
+            rewriter = GlsRewriter(glslist)
+            for copy in copies:
+                updateFile(copy, glslist, rewriter)
+
+        record("updateFile", time_stage(repeat, update, restore))
+    return results
+
+
+def compare(results: list[dict[str, Any]], baseline_file: str, tolerance: float) -> int:
+    """Report the change from a baseline and return the number of stages
+    slower than ``tolerance`` times the baseline.
+    """
+    with open(baseline_file) as fd:
+        baseline = {r["name"]: r for r in json.load(fd)["results"]}
+    regressions = 0
+    print(f"\nCompared with {baseline_file}:")
+    for entry in results:
+        old = baseline.get(entry["name"])
+        if "best" not in entry or old is None or "best" not in old:
+            continue
+        ratio = entry["best"] / old["best"] if old["best"] else float("inf")
+        flag = ""
+        if ratio > tolerance:
+            flag = "  REGRESSION"
+            regressions += 1
+        print(f"{entry['name']:28s} {old['best']:9.4f}s -> {entry['best']:9.4f}s  x{ratio:5.2f}{flag}")
+    return regressions
+
+
+def main() -> int:
+    """Run the benchmark suite and return the exit status."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("texfiles", nargs="*", help="TeX files to use instead of a generated corpus.")
+    parser.add_argument("--files", type=int, default=10, help="Number of generated chapter files.")
+    parser.add_argument("--lines", type=int, default=1000, help="Number of lines per generated chapter.")
+    parser.add_argument("--density", type=float, default=0.05, help="Fraction of words that are terms.")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the corpus.")
+    parser.add_argument("-g", "--glossary", action="store_true", help="Include glossary entries.")
+    parser.add_argument("-t", "--tags", default="", help="Space separated tags to select definitions.")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Number of timing repeats.")
+    parser.add_argument("-o", "--output", help="Write the results to this JSON file.")
+    parser.add_argument("--baseline", help="JSON results file to compare against.")
+    parser.add_argument(
+        "--tolerance", type=float, default=1.2, help="Slowdown relative to the baseline that fails."
+    )
+    args = parser.parse_args()
+    glossarytools.doGlossary = args.glossary
+    utags = set(args.tags.split())
+
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        if args.texfiles:
+            texfiles = args.texfiles
+            corpus: dict[str, Any] = {"texfiles": texfiles}
+        else:
+            texfiles = make_corpus(corpus_dir, args.files, args.lines, args.density, args.seed)
+            corpus = {"files": args.files, "lines": args.lines, "density": args.density, "seed": args.seed}
+        corpus["characters"] = sum(os.path.getsize(f) for f in texfiles)
+        print(f"{len(texfiles)} files, {corpus['characters']} characters")
+        results = run_suite(texfiles, args.repeat, utags)
+
+    report = {
+        "version": RESULTS_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": {"glossary": args.glossary, "tags": sorted(utags), "repeat": args.repeat},
+        "corpus": corpus,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w") as fd:
+            json.dump(report, fd, indent=2)
+            fd.write("\n")
+
+    if args.baseline:
+        return 1 if compare(results, args.baseline, args.tolerance) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+"""Time reading and writing :file:`etc/authordb.yaml`.
+
+The database is loaded and written back out, as the author database tools
+do, with the pure Python loader and dumper from PyYAML and with
+yamltools, which uses libyaml when PyYAML was built with it. The written
+YAML is checked to be the same in both cases.
+
+Run from the top of the repository::
+
+    python bin/benchmarks/bench_yaml.py -r 5 -o yaml.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from typing import Any
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.path.pardir))
+
+import yaml  # noqa: E402
+import yamltools  # noqa: E402
+
+BIN = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.path.pardir)
+AUTHORDB = os.path.join(BIN, os.path.pardir, "etc", "authordb.yaml")
+
+
+def time_call(repeat: int, func: Callable[[], object]) -> list[float]:
+    """Return the time of each of ``repeat`` calls of ``func``."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def summarize(name: str, times: list[float]) -> dict[str, Any]:
+    """Print and return the best and median of some times."""
+    print(f"{name:24s} {min(times):9.4f}s")
+    return {"name": name, "best": min(times), "median": statistics.median(times), "times": times}
+
+
+def main() -> int:
+    """Run the benchmark and return the exit status."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Number of runs of each stage.")
+    parser.add_argument("-o", "--output", help="Write the results to this JSON file.")
+    args = parser.parse_args()
+
+    with open(AUTHORDB) as fd:
+        content = fd.read()
+    data = yaml.safe_load(content)
+    if yamltools.dump_yaml(data, allow_unicode=True) != yaml.safe_dump(data, allow_unicode=True):
+        print("yamltools and PyYAML write different YAML", file=sys.stderr)
+        return 1
+    print(f"loader {yamltools.SafeLoader.__name__}, dumper {yamltools.SafeDumper.__name__}")
+
+    results = [
+        summarize("yaml.safe_load", time_call(args.repeat, lambda: yaml.safe_load(content))),
+        summarize("yamltools.load_yaml", time_call(args.repeat, lambda: yamltools.load_yaml(content))),
+        summarize(
+            "yaml.safe_dump",
+            time_call(args.repeat, lambda: yaml.safe_dump(data, allow_unicode=True)),
+        ),
+        summarize(
+            "yamltools.dump_yaml",
+            time_call(args.repeat, lambda: yamltools.dump_yaml(data, allow_unicode=True)),
+        ),
+    ]
+
+    if args.output:
+        report = {
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pyyaml": yaml.__version__,
+            "libyaml": yaml.__with_libyaml__,
+            "repeat": args.repeat,
+            "results": results,
+        }
+        with open(args.output, "w") as fd:
+            json.dump(report, fd, indent=2)
+            fd.write("\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
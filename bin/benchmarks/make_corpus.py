@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+
+r"""Generate a synthetic TeX corpus for benchmarking generateAcronyms.py.
+
+The corpus is a set of chapter files and a main file that inputs them. Each
+line is filler text with a fraction of its words replaced by terms from
+:file:`etc/glossarydefs.csv`, some of them already marked with ``\gls``,
+plus the occasional comment, upper case word with no definition and
+``\cite``. The same arguments always give the same corpus.
+
+Run from the top of the repository::
+
+    python bin/benchmarks/make_corpus.py --files 20 --lines 2000 corpus
+"""
+
+import argparse
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), os.path.pardir))
+
+from glossarytools import read_glossarydef, setup_paths  # noqa: E402
+
+FILLER = (
+    "the of and to in is for that with on as are by this be from at which it an we can data will "
+    "system each image processing should model results used all its not survey these has been have "
+    "observations were more than also time catalog one two field source"
+).split()
+UNDEFINED = ["QQX", "ZZTOP", "WXYZ", "NNN", "XXX"]
+
+
+def make_corpus(
+    outdir: str,
+    files: int = 10,
+    lines: int = 1000,
+    density: float = 0.05,
+    seed: int = 1,
+    words: int = 12,
+    terms: list[str] | None = None,
+) -> list[str]:
+    """Write a synthetic corpus and return the paths of the chapter files.
+
+    Parameters
+    ----------
+    outdir : `str`
+        Directory to write the corpus to. Created if needed.
+    files : `int`, optional
+        Number of chapter files.
+    lines : `int`, optional
+        Number of lines in each chapter.
+    density : `float`, optional
+        Fraction of words that are glossary terms.
+    seed : `int`, optional
+        Seed for the random number generator.
+    words : `int`, optional
+        Number of words on each line.
+    terms : `list` [`str`], optional
+        Terms to use. Read from :file:`etc/glossarydefs.csv` if not given.
+
+    Returns
+    -------
+    texfiles : `list` [`str`]
+        Paths to the chapter files. The main file, :file:`main.tex`, inputs
+        all of them.
+    """
+    if terms is None:
+        terms = sorted(read_glossarydef(setup_paths()[0], set()))
+    rnd = random.Random(seed)
+    os.makedirs(outdir, exist_ok=True)
+
+    def word() -> str:
+        if rnd.random() >= density:
+            return rnd.choice(FILLER)
+        choice = rnd.random()
+        term = rnd.choice(terms)
+        if choice < 0.1:
+            return rf"\gls{{{term}}}"
+        if choice < 0.15:
+            return rnd.choice(UNDEFINED)
+        if choice < 0.2:
+            return f"({term})"
+        return term
+
+    texfiles = []
+    for i in range(files):
+        filename = os.path.join(outdir, f"chapter{i:03d}.tex")
+        with open(filename, "w") as fd:
+            print(rf"\section{{Chapter {i}}}", file=fd)
+            for n in range(lines):
+                line = " ".join(word() for _ in range(words))
+                if n % 50 == 0:
+                    line += r" \citep{LSE-163}"
+                elif n % 20 == 0:
+                    line += f" % comment mentioning {rnd.choice(terms)}"
+                print(line, file=fd)
+        texfiles.append(filename)
+
+    with open(os.path.join(outdir, "main.tex"), "w") as fd:
+        print(r"\documentclass{article}", file=fd)
+        print(r"\begin{document}", file=fd)
+        for filename in texfiles:
+            print(rf"\input{{{os.path.splitext(os.path.basename(filename))[0]}}}", file=fd)
+        print(r"\end{document}", file=fd)
+    return texfiles
+
+
+def main() -> None:
+    """Write the corpus described by the command line."""
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("outdir", help="Directory to write the corpus to.")
+    parser.add_argument("--files", type=int, default=10, help="Number of chapter files.")
+    parser.add_argument("--lines", type=int, default=1000, help="Number of lines per chapter.")
+    parser.add_argument("--density", type=float, default=0.05, help="Fraction of words that are terms.")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed.")
+    args = parser.parse_args()
+    texfiles = make_corpus(args.outdir, args.files, args.lines, args.density, args.seed)
+    print(f"Wrote {len(texfiles)} files to {args.outdir}")
+
+
+if __name__ == "__main__":
+    main()
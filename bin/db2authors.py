@@ -17,6 +17,7 @@ This program requires the "yaml" package to be installed.
 
 import argparse
 import csv
+import functools
 import io
 import os.path
 import re
@@ -24,11 +25,12 @@ import string
 import sys
 from _collections_abc import dict_keys
 from abc import ABC, abstractmethod
+from collections.abc import Iterable, Mapping
 from dataclasses import asdict as dataclass_asdict
 from pathlib import Path
 from typing import Any, Self, TypeAlias
 
-import yaml
+from yamltools import load_yaml, load_yaml_snapshot
 
 try:
     from typing import Annotated
@@ -49,9 +51,24 @@ except ImportError:
     OptStr: TypeAlias = str | None  # type: ignore[no-redef,misc]
 
 
+# Plain text of each LaTeX string converted so far.
+_plain_text: dict[str, str] = {}
+
+
+@functools.cache
+def _latex_converter() -> Any:
+    """Return the converter shared by every call of `latex2text`."""
+    from pylatexenc.latex2text import LatexNodes2Text
+
+    return LatexNodes2Text()
+
+
 def latex2text(latex: str) -> str:
     """Convert a LaTeX string into a plain text string.
 
+    The same names and institutes are converted many times so each result
+    is remembered.
+
     Parameters
     ----------
     latex : `str`
@@ -62,9 +79,43 @@ def latex2text(latex: str) -> str:
     plain : `str`
         The plain text version.
     """
-    from pylatexenc.latex2text import LatexNodes2Text
+    plain = _plain_text.get(latex)
+    if plain is None:
+        plain = _plain_text[latex] = _latex_converter().latex_to_text(latex)
+    return plain
+
+
+def latex2text_many(latex: Iterable[str], jobs: int = 1) -> list[str]:
+    """Convert many LaTeX strings into plain text.
+
+    Each distinct string is only converted once and strings converted
+    before are not converted again.
+
+    Parameters
+    ----------
+    latex : `~collections.abc.Iterable` [`str`]
+        Latex strings to convert.
+    jobs : `int`, optional
+        Number of processes to convert with.
 
-    return LatexNodes2Text().latex_to_text(latex)
+    Returns
+    -------
+    plain : `list` [`str`]
+        The plain text version of each string, in the order given.
+    """
+    latex = list(latex)
+    todo = [text for text in dict.fromkeys(latex) if text not in _plain_text]
+    if jobs > 1 and len(todo) > 1:
+        import concurrent.futures
+
+        # Large chunks as each conversion is quick.
+        chunksize = -(-len(todo) // (4 * jobs))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+            _plain_text.update(zip(todo, pool.map(latex2text, todo, chunksize=chunksize), strict=True))
+    else:
+        for text in todo:
+            latex2text(text)
+    return [_plain_text[text] for text in latex]
 
 
 @dataclasses.dataclass(frozen=True)
@@ -209,7 +260,10 @@ class AuthorFactory:
     def __init__(self, affiliations: dict[str, Any], authors: dict[str, Any]) -> None:
         self._affiliations = affiliations
         self._authors = authors
-        self._reverse_affil = {self.get_affiliation(aid): aid for aid in self._affiliations}
+        # Every affiliation is built once and the same instance is shared
+        # by all the authors that have it.
+        self._affiliation_table = {aid: self._build_affiliation(aid) for aid in self._affiliations}
+        self._reverse_affil = {affil: aid for aid, affil in self._affiliation_table.items()}
 
     @classmethod
     def from_authordb(cls, authordb: dict[str, Any]) -> Self:
@@ -228,6 +282,12 @@ class AuthorFactory:
         return self._reverse_affil[affil]
 
     def get_affiliation(self, affiliationid: str) -> Affiliation:
+        try:
+            return self._affiliation_table[affiliationid]
+        except KeyError:
+            raise RuntimeError(f"Affiliation {affiliationid!r} not found in affiliation database") from None
+
+    def _build_affiliation(self, affiliationid: str) -> Affiliation:
         raw_affil = self._affiliations.get(affiliationid)
         if not raw_affil:
             raise RuntimeError(f"Affiliation {affiliationid!r} not found in affiliation database")
@@ -272,6 +332,66 @@ class AuthorFactory:
         return domains
 
     def get_author(self, authorid: str) -> Author:
+        unresolved: dict[str, str] = {}
+        author = self._build_author(authorid, unresolved)
+        for email in unresolved.values():
+            print(
+                f"WARNING: Unable to resolve email address for author '{authorid}' email '{email}'",
+                file=sys.stderr,
+            )
+        return author
+
+    def get_authors(self, authorids: Iterable[str]) -> list[Author]:
+        """Return many authors, checking them all first.
+
+        Every problem is reported at once, rather than stopping at the first
+        unknown author or warning about each email address in turn.
+
+        Parameters
+        ----------
+        authorids : `~collections.abc.Iterable` [`str`]
+            IDs of the authors.
+
+        Returns
+        -------
+        authors : `list` [`Author`]
+            The authors, in the order given.
+
+        Raises
+        ------
+        RuntimeError
+            Raised if any of the authors, or any of their affiliations, is
+            not in the database.
+        """
+        authorids = list(authorids)
+        problems = []
+        if missing := [authorid for authorid in dict.fromkeys(authorids) if authorid not in self._authors]:
+            problems.append(f"{len(missing)} author(s) not found in author database: {', '.join(missing)}")
+        for authorid in dict.fromkeys(authorids):
+            if authorid in self._authors:
+                unknown = [a for a in self._authors[authorid]["affil"] if a not in self._affiliation_table]
+                if unknown:
+                    problems.append(
+                        f"Author {authorid!r} refers to unknown affiliation(s) {', '.join(unknown)}"
+                    )
+        if problems:
+            raise RuntimeError("\n".join(problems))
+
+        unresolved: dict[str, str] = {}
+        authors = [self._build_author(authorid, unresolved) for authorid in authorids]
+        if unresolved:
+            print(
+                f"WARNING: Unable to resolve email address for {len(unresolved)} author(s):",
+                *(f"  {authorid} email '{email}'" for authorid, email in unresolved.items()),
+                sep="\n",
+                file=sys.stderr,
+            )
+        return authors
+
+    def _build_author(self, authorid: str, unresolved: dict[str, str]) -> Author:
+        """Return an author, adding their ID and email to ``unresolved``
+        if the email address cannot be worked out.
+        """
         if authorid not in self._authors:
             raise RuntimeError(f"Author {authorid!r} not found in author database")
         author = self._authors[authorid]
@@ -298,10 +418,7 @@ class AuthorFactory:
         # mode here.
         if (not domain or not username) and author["affil"][0] != "_":
             # Only warn if we need the email.
-            print(
-                f"WARNING: Unable to resolve email address for author '{authorid}' email '{email}'",
-                file=sys.stderr,
-            )
+            unresolved[authorid] = str(email)
         if not domain:
             domain = "none.com"
         if not username:
@@ -318,6 +435,13 @@ class AuthorFactory:
         )
 
 
+def _render_chunk(
+    generator: type["AuthorBlockGenerator"], labels: Mapping[Affiliation, Any], authors: list[Author]
+) -> list[str]:
+    """Return the text for each of some authors, in a worker process."""
+    return generator(authors).render_authors(labels)
+
+
 class AuthorTextGenerator(ABC):
     """Class to create some text for authors."""
 
@@ -363,7 +487,70 @@ class AuthorTextGenerator(ABC):
         raise NotImplementedError()
 
 
-class AASTeX(AuthorTextGenerator):
+class AuthorBlockGenerator(AuthorTextGenerator):
+    """Generator for formats where the text for each author can be made
+    on its own, from the author and the labels of the affiliations.
+
+    Parameters
+    ----------
+    authors : `list` [`Author`]
+        The authors, in order.
+    jobs : `int`, optional
+        Number of processes to render the authors with.
+    """
+
+    def __init__(self, authors: list[Author], jobs: int = 1) -> None:
+        super().__init__(authors)
+        self.jobs = jobs
+
+    @abstractmethod
+    def _author_block(self, author: Author, labels: Mapping[Affiliation, Any]) -> str:
+        """Return the text for one author.
+
+        Parameters
+        ----------
+        author : `Author`
+            The author.
+        labels : `~collections.abc.Mapping` [`Affiliation`, `typing.Any`]
+            The number or label of each affiliation.
+
+        Returns
+        -------
+        text : `str`
+            The text for the author.
+        """
+        raise NotImplementedError()
+
+    def render_authors(self, labels: Mapping[Affiliation, Any]) -> list[str]:
+        """Return the text for each author.
+
+        The text for each author depends only on the author and the labels
+        of the affiliations, so with more than one job the authors are split
+        into chunks rendered in separate processes, and put back in order.
+
+        Parameters
+        ----------
+        labels : `~collections.abc.Mapping` [`Affiliation`, `typing.Any`]
+            The number or label of each affiliation.
+
+        Returns
+        -------
+        blocks : `list` [`str`]
+            The text for each author, in order.
+        """
+        if self.jobs <= 1 or len(self.authors) < 2:
+            return [self._author_block(author, labels) for author in self.authors]
+
+        import concurrent.futures
+
+        size = -(-len(self.authors) // (4 * self.jobs))
+        chunks = [self.authors[i : i + size] for i in range(0, len(self.authors), size)]
+        with concurrent.futures.ProcessPoolExecutor(max_workers=self.jobs) as pool:
+            rendered = pool.map(functools.partial(_render_chunk, type(self), labels), chunks)
+            return [block for chunk in rendered for block in chunk]
+
+
+class AASTeX(AuthorBlockGenerator):
     """AASTeX 6 specific generation."""
 
     mode = "aas"
@@ -385,21 +572,21 @@ class AASTeX(AuthorTextGenerator):
         """
         return f"[{author.orcid}]" if author.orcid else ""
 
+    def _author_block(self, author: Author, labels: Mapping[Affiliation, Any]) -> str:
+        lines = [""]
+        # Text depends on aastex 7 vs 6.
+        parentext = self._generate_paren_text(author)
+        lines.append(rf"\author{parentext}{{{author.full_latex_name}}}")
+        for alt in author.altaffil:
+            lines.append(rf"\altaffiliation{{{alt}}}")
+        for affil in author.affiliations:
+            lines.append(rf"\affiliation{{{affil.get_full_address_with_institute()}}}")
+        lines.append(rf"\email{{{author.email}}}")
+        return "\n".join(lines)
+
     def generate(self, header: bool = True) -> str:
         """Generate AASTeX format."""
-        lines = []
-        for author in self.authors:
-            lines.append("")
-            # Text depends on aastex 7 vs 6.
-            parentext = self._generate_paren_text(author)
-            lines.append(rf"\author{parentext}{{{author.full_latex_name}}}")
-            for alt in author.altaffil:
-                lines.append(rf"\altaffiliation{{{alt}}}")
-            for affil in author.affiliations:
-                lines.append(rf"\affiliation{{{affil.get_full_address_with_institute()}}}")
-            lines.append(rf"\email{{{author.email}}}")
-
-        return (self.get_header() if header else "") + "\n".join(lines)
+        return (self.get_header() if header else "") + "\n".join(self.render_authors({}))
 
 
 class AASTeX7(AASTeX):
@@ -453,7 +640,7 @@ class LsstDoc(AuthorTextGenerator):
         return (self.get_header() if header else "") + "\\author{\n" + "\n".join(lines) + "\n}"
 
 
-class Arxiv(AuthorTextGenerator):
+class Arxiv(AuthorBlockGenerator):
     """Generate ArXiv format.
 
     Authors: Author One (1), Author Two (1 and 2), Author Three (2)
@@ -462,14 +649,14 @@ class Arxiv(AuthorTextGenerator):
 
     mode = "arxiv"
 
+    def _author_block(self, author: Author, labels: Mapping[Affiliation, Any]) -> str:
+        affil_numbers = [str(labels[affil]) for affil in author.affiliations]
+        return f"{author.full_name} ({' and '.join(affil_numbers)})"
+
     def generate(self, header: bool = True) -> str:
         """Generate ArXiv format."""
         affil_to_number = self.number_affiliations()
-
-        author_text = []
-        for author in self.authors:
-            affil_numbers = [str(affil_to_number[affil]) for affil in author.affiliations]
-            author_text.append(f"{author.full_name} ({' and '.join(affil_numbers)})")
+        author_text = self.render_authors(affil_to_number)
 
         institutions = []
         for affil, number in affil_to_number.items():
@@ -478,7 +665,7 @@ class Arxiv(AuthorTextGenerator):
         return f"Authors: {', '.join(author_text)}\n       ({', '.join(institutions)})"
 
 
-class ProcSpie(AuthorTextGenerator):
+class ProcSpie(AuthorBlockGenerator):
     r"""SPIE proceedings.
 
     \author[a]{Anna A. Author}
@@ -490,6 +677,10 @@ class ProcSpie(AuthorTextGenerator):
 
     mode = "spie"
 
+    def _author_block(self, author: Author, labels: Mapping[Affiliation, Any]) -> str:
+        affil_labels = [labels[affil] for affil in author.affiliations]
+        return rf"\author[{','.join(affil_labels)}]{{{author.full_latex_name}}}"
+
     def generate(self, header: bool = True) -> str:
         affil_to_number = self.number_affiliations()
         chars = string.ascii_lowercase + string.ascii_uppercase
@@ -509,10 +700,7 @@ class ProcSpie(AuthorTextGenerator):
                 label_counter += 1
             affil_to_label[affil] = label
 
-        authors = []
-        for author in self.authors:
-            labels = [affil_to_label[affil] for affil in author.affiliations]
-            authors.append(rf"\author[{','.join(labels)}]{{{author.full_latex_name}}}")
+        authors = self.render_authors(affil_to_label)
 
         affiliations: list[str] = []
         for affil, label in affil_to_label.items():
@@ -521,22 +709,22 @@ class ProcSpie(AuthorTextGenerator):
         return (self.get_header() if header else "") + "\n".join(authors + affiliations)
 
 
-class WebOfC(AuthorTextGenerator):
+class WebOfC(AuthorBlockGenerator):
     """WebOfC generator."""
 
     mode = "webofc"
 
+    def _author_block(self, author: Author, labels: Mapping[Affiliation, Any]) -> str:
+        author_text = rf"\firstname{{{author.given_name}}} \lastname{{{author.family_name}}}"
+        affil_numbers = [labels[affil] for affil in author.affiliations]
+        author_text += " " + " ".join(rf"\inst{{{n}}}" for n in affil_numbers)
+        if author.orcid:
+            author_text += rf" \orcidlink{{{author.orcid}}}"
+        return author_text
+
     def generate(self, header: bool = True) -> str:
         affil_to_number = self.number_affiliations()
-
-        authors = []
-        for author in self.authors:
-            author_text = rf"\firstname{{{author.given_name}}} \lastname{{{author.family_name}}}"
-            affil_numbers = [affil_to_number[affil] for affil in author.affiliations]
-            author_text += " " + " ".join(rf"\inst{{{n}}}" for n in affil_numbers)
-            if author.orcid:
-                author_text += rf" \orcidlink{{{author.orcid}}}"
-            authors.append(author_text)
+        authors = self.render_authors(affil_to_number)
 
         # The dict is ordered correctly by default.
         affiliations = " \\and\n".join(a.get_full_address_with_institute() for a in affil_to_number)
@@ -551,23 +739,23 @@ class WebOfC(AuthorTextGenerator):
         )
 
 
-class ASCOM(AuthorTextGenerator):
+class ASCOM(AuthorBlockGenerator):
     """Astronomy and Computing."""
 
     mode = "ascom"
 
+    def _author_block(self, author: Author, labels: Mapping[Affiliation, Any]) -> str:
+        affil_numbers = [str(labels[affil]) for affil in author.affiliations]
+        orclink = ""
+        if author.orcid:
+            orclink = f"\\orcidlink{{{author.orcid}}}"
+        return f"\\author[{','.join(affil_numbers)}]{{{author.full_latex_name}{orclink}}}"
+
     def generate(self, header: bool = True) -> str:
         """Generate A&C format."""
         affil_to_number = self.number_affiliations()
 
-        authors = []
-        for author in self.authors:
-            affil_numbers = [str(affil_to_number[affil]) for affil in author.affiliations]
-            orclink = ""
-            if author.orcid:
-                orclink = f"\\orcidlink{{{author.orcid}}}"
-            author_text = f"\\author[{','.join(affil_numbers)}]{{{author.full_latex_name}{orclink}}}"
-            authors.append(author_text)
+        authors = self.render_authors(affil_to_number)
         affiliations = []
         for affil, number in affil_to_number.items():
             country = ""
@@ -718,7 +906,7 @@ class MNRAS(AuthorTextGenerator):
 """
 
 
-class AAP(AuthorTextGenerator):
+class AAP(AuthorBlockGenerator):
     r"""Generate A&A format.
 
     Example output:
@@ -738,13 +926,13 @@ class AAP(AuthorTextGenerator):
 
     mode = "aap"
 
+    def _author_block(self, author: Author, labels: Mapping[Affiliation, Any]) -> str:
+        affil_numbers = [str(labels[affil]) for affil in author.affiliations]
+        return rf"{author.full_latex_name}\inst{{{','.join(affil_numbers)}}}"
+
     def generate(self, header: bool = True) -> str:
         affil_to_number = self.number_affiliations()
-        authors = []
-        for author in self.authors:
-            affil_numbers = [str(affil_to_number[affil]) for affil in author.affiliations]
-            author_text = rf"{author.full_latex_name}\inst{{{','.join(affil_numbers)}}}"
-            authors.append(author_text)
+        authors = self.render_authors(affil_to_number)
 
         affiliations = []
         for affil in affil_to_number:
@@ -886,17 +1074,28 @@ class AASCSV(AuthorTextGenerator):
         return output.getvalue()
 
 
-def dump_csvall(factory: AuthorFactory) -> None:
+def dump_csvall(factory: AuthorFactory, jobs: int = 1) -> None:
     """Generate CSV of ALL authors for easier lookup of ID .
     Authorid, Name, Institution id
     put this in authors.csv
+
+    All the names and affiliations are converted to plain text first, with
+    ``jobs`` processes.
     """
     author_ids = factory.get_author_ids()
+    authors = factory.get_authors(author_ids)
+    affiliations = [factory.get_affiliation(id) for id in factory.get_affiliation_ids()]
+    latex2text_many(
+        [
+            *(text for a in authors for text in (a.full_latex_name, a.given_name, a.family_name)),
+            *(a.get_full_address_with_institute() for a in affiliations),
+        ],
+        jobs,
+    )
     with open("authors.csv", "w", newline="") as outf:
         writer = csv.writer(outf)
         writer.writerow(["Rubin AuthorID", "Name", "Affiliation ID(s)", "AASTEX"])
-        for authorid in author_ids:
-            author = factory.get_author(authorid)
+        for authorid, author in zip(author_ids, authors, strict=True):
             aas7_generator = AASTeX7([author])
             # people seeing the full affiliation copied it so putting IDs
             affils = " / ".join(factory.get_affiliation_id(a) for a in author.affiliations)
@@ -909,8 +1108,7 @@ def dump_csvall(factory: AuthorFactory) -> None:
     with open("affiliations.csv", "w") as outf:
         writer = csv.writer(outf)
         writer.writerow(["ID", "Affiliation"])
-        for id in affil_ids:
-            affil = factory.get_affiliation(id)
+        for id, affil in zip(affil_ids, affiliations, strict=True):
             writer.writerow([id, latex2text(affil.get_full_address_with_institute())])
 
 
@@ -932,11 +1130,11 @@ def load_dni(donotinclude: str) -> set[str]:
     """
     authorids: set[str] = set()
     with open(donotinclude, encoding="utf-8") as f:
-        authorids = set(yaml.safe_load(f) or [])
+        authorids = set(load_yaml(f) or [])
     dnip = Path("dni.yaml")
     if dnip.exists():  # local per doc
         with dnip.open(encoding="utf-8") as f:
-            dni_local = yaml.safe_load(f)
+            dni_local = load_yaml(f)
             authorids.update(dni_local)
 
     if len(authorids) > 0:
@@ -983,6 +1181,13 @@ if __name__ == "__main__":
                             'verbose' displays all the information...""",
     )
     parser.add_argument("-n", "--noafil", action="store_true", help="""Do not add affil at all for arxiv.""")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="""Number of processes to convert LaTeX or render authors with.""",
+    )
     args = parser.parse_args()
 
     # This is the database file with all the generic information
@@ -991,21 +1196,20 @@ if __name__ == "__main__":
     dbfile = os.path.normpath(os.path.join(exedir, os.path.pardir, "etc", "authordb.yaml"))
     dnifile = os.path.normpath(os.path.join(exedir, os.path.pardir, "etc", "dni.yaml"))
 
-    with open(dbfile) as fh:
-        authordb = yaml.safe_load(fh)
+    authordb = load_yaml_snapshot(dbfile)
 
     factory = AuthorFactory.from_authordb(authordb)
 
     if args.mode == "csvall":
-        dump_csvall(factory)
+        dump_csvall(factory, args.jobs)
         exit(0)
 
     with open(authorfile) as fh:
-        authors = yaml.safe_load(fh)
+        authors = load_yaml(fh)
 
     dni_list = load_dni(dnifile)
     authors = [a for a in authors if a not in dni_list]
-    authors = [factory.get_author(authorid) for authorid in authors]
+    authors = factory.get_authors(authors)
 
     generator_lut: dict[str, type[AuthorTextGenerator]] = {
         "aas": AASTeX,
@@ -1023,5 +1227,9 @@ if __name__ == "__main__":
     if args.mode not in generator_lut:
         raise RuntimeError(f"Unknown generator mode: {args.mode}")
 
-    generator = generator_lut[args.mode](authors)
+    generator_class = generator_lut[args.mode]
+    if issubclass(generator_class, AuthorBlockGenerator):
+        generator: AuthorTextGenerator = generator_class(authors, jobs=args.jobs)
+    else:
+        generator = generator_class(authors)
     print(generator.generate())
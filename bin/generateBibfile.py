@@ -15,12 +15,12 @@ from datetime import UTC, datetime
 
 import latexcodec  # noqa provides the latex+latin codec
 import pybtex.database
-import yaml
 from algoliasearch.search.client import SearchClientSync, SearchResponse
 from bibtools import BibDict, BibEntry
 from pybtex.database import BibliographyData
 from pylatexenc.latex2text import LatexNodes2Text
 from pylatexenc.latexencode import unicode_to_latex
+from yamltools import load_yaml
 
 MAXREC = 2000
 
@@ -488,7 +488,7 @@ if __name__ == "__main__":
     doimap: dict[str, str] | None = None
     if args.dois:
         with open(args.dois) as fh:
-            doimap = yaml.safe_load(fh)
+            doimap = load_yaml(fh)
 
     result = asyncio.run(generate_bibfile(args.query, args.external, doimap))
 
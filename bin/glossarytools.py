@@ -0,0 +1,3277 @@
+r"""Utility that can be used to automatically generate a list of acronyms,
+abbreviations and glossary entries from multiple TeX files.
+
+Acronynm and glossary entries are read from the :file:`glossarydefs.csv` in
+the lsst-texmf distribution. Optionally, this list may be augmented with local
+definitions stored in :file:`myacronyms.txt`. Adding terms to
+:file:`skipacronyms.txt` will cause them to be excluded.
+
+By default, terms are written to a table in :file:`acronyms.tex` which may
+then be included in a LaTeX document.
+
+Alternatively, if the ``-g`` (or ``--glossary``) option is passed, they will be
+written to :file:`aglossary.tex` in LaTeX glossary format instead. All
+glossary lookup keys are the glossary name. For items to appear in the
+glossary you must ``\gls{ITEM}`` at least once.
+
+Passing ``-u`` or ``--update`` will process all LaTeX files to identify
+potential glossary entries and will mark them with ``\gls``.
+
+Use ``-m`` or ``--mode`` with ["txt", "rst","tex"] to choose output formats
+"""
+
+import argparse
+import functools
+import hashlib
+import io
+import os.path
+import re
+import sys
+import time
+import warnings
+from collections.abc import Iterable, Iterator, Set
+from typing import IO, Any, NamedTuple, TypeAlias
+
+glsFile = "aglossary.tex"
+# Bump when the content of cached objects changes.
+CACHE_VERSION = 4
+# The cache is pruned back to this size, least recently used entries first.
+CACHE_MAX_BYTES = 16 * 1024 * 1024
+doGlossary = False  # Set from the command line.
+OUTPUT_MODES = ["txt", "rst", "tex", "aastex"]
+specialChars = "_$&%^#"
+specialCharsRe = re.compile(r"[_$&%^#]")
+# Commands that read another tex file.
+INCLUDE_RE = re.compile(r"\\(input|include|subfile)\s*\{([^}]+)\}")
+# Comment in a line of tex.
+TEX_COMMENT = re.compile(r"(?<!\\)%.*")
+# Word in the search index of the glossary.
+SEARCH_TOKEN_RE = re.compile(r"\w+")
+# Locale of a glossary translation, such as es or pt_BR.
+LOCALE_RE = re.compile(r"[a-z]{2,3}(_[A-Z]{2})?")
+
+
+#  Match for extracting acronyms from the glossary myacronyms .txt files
+MATCH_ACRONYM = r"^([\w/&\-\+ -']+)\s*:\s*(.*)$"
+MATCH_ACRONYM_RE = re.compile(MATCH_ACRONYM)
+# following regular expression define an acronym-like string as follows:
+# - including upper case characters and numbers
+# - starting with a letter
+CAP_ACRONYM = re.compile(r"\b[A-Z][A-Z0-9]+\b")
+# Term inside \gls{} or \Gls{}.
+GLS_ENTRY = re.compile(r"ls{([\w ]+)}")
+# Characters that make a glossary term a regular expression rather than
+# plain text.
+_REGEX_SPECIAL = re.compile(r"[.^$*+?{}\[\]\\|()]")
+# pandoc can not handle gls so is not used unless this is set.
+USE_PANDOC = False
+
+# Modules that are only needed on some code paths are imported where they
+# are used, so that runs that do not need them start faster.
+
+
+def get_pypandoc() -> Any:
+    """Return the pypandoc module if pandoc is to be used, `None` if not or
+    if it is not available.
+
+    pypandoc is only imported, and pandoc looked for, the first time this is
+    called with `USE_PANDOC` set.
+    """
+    return _probe_pypandoc() if USE_PANDOC else None
+
+
+@functools.cache
+def _probe_pypandoc() -> Any:
+    """Import pypandoc and check pandoc can be found."""
+    try:
+        import pypandoc
+
+        # raises OSError if pypandoc is available but pandoc isn't.
+        pypandoc.get_pandoc_path()
+    except (ImportError, OSError):
+        return None
+    return pypandoc
+
+
+def _parse_line(line: str) -> tuple[str, str] | tuple[None, None]:
+    """Parse a line and return an acronym and definition.
+
+    Parameters
+    ----------
+    line : `str`
+        Line to analyze.
+
+    Returns
+    -------
+    acronym, definition : tuple(str, str)
+        Acronym and definition. Tuple of None, None if the line has
+        no acronym definition.
+    """
+    nothing = (None, None)
+
+    # Blank lines
+    line = line.strip()
+    if not line:
+        return nothing
+
+    # Comment lines
+    if line.startswith("#"):
+        return nothing
+
+    matched = MATCH_ACRONYM_RE.match(line)
+    if not matched:
+        return nothing
+
+    acr, defn = matched.groups()
+    return acr.rstrip(), defn
+
+
+class GlossaryStore:
+    """The content of an LSST format glossarydefs.csv file held in columns.
+
+    The file is read once and each column is kept as a list, with the
+    terms, tags and types interned. Indexes map each term, tag, type and
+    alternative term to the rows that have it, so selecting definitions
+    for a set of tags does not need the file to be read again.
+
+    Parameters
+    ----------
+    filename : `str`
+        Path to the file, used in error messages.
+    rows : `~collections.abc.Iterable` [`list` [`str`]]
+        The rows of the file after the header.
+    strict : `bool`, optional
+        Raise `ValueError` at the first row with too few columns. Otherwise
+        such rows are kept, padded with empty columns, and their real width
+        recorded in `widths` so that every one can be reported.
+    """
+
+    COLUMNS = 6
+    """Number of columns in each row."""
+
+    def __init__(self, filename: str, rows: Iterable[list[str]], strict: bool = True) -> None:
+        self.filename = filename
+        self.terms: list[str] = []
+        self.definitions: list[str] = []
+        self.tags: list[str] = []
+        """The tags of each row as written in the file."""
+        self.doc_tags: list[str] = []
+        self.alternatives: list[tuple[str, ...]] = []
+        self.types: list[str] = []
+        self.widths: list[int] = []
+        """Number of columns in each row, blank rows have none."""
+        self.lines: list[int] = []
+        """Row number in the file of each row, the header being 1."""
+
+        self._by_term: dict[str, list[int]] = {}
+        self._by_tag: dict[str, list[int]] = {}
+        self._by_type: dict[str, list[int]] = {}
+        self._by_alternative: dict[str, list[int]] = {}
+
+        lc = 1
+        for lc, row in enumerate(rows, start=2):
+            if len(row) < 2:  # blank line
+                self._append(lc, len(row), "", "", "", "", (), "")
+                continue
+            if len(row) < self.COLUMNS and strict:
+                print(f"Error reading {filename} line {lc}-{row}")
+                raise ValueError("Too few columns.")
+            padded = [*row, *[""] * (self.COLUMNS - len(row))]
+            acr, defn, tags, doc_tags, alternatives, entryType = padded[: self.COLUMNS]
+            alts = tuple(sys.intern(a.strip()) for a in alternatives.split(",") if a.strip())
+            self._append(lc, len(row), acr, defn, tags, doc_tags, alts, entryType)
+
+    def _append(
+        self,
+        line: int,
+        width: int,
+        acr: str,
+        defn: str,
+        tags: str,
+        doc_tags: str,
+        alternatives: tuple[str, ...],
+        entryType: str,
+    ) -> None:
+        """Add a row to the columns and indexes."""
+        row = len(self.terms)
+        acr = sys.intern(acr)
+        entryType = sys.intern(entryType)
+        self.terms.append(acr)
+        self.definitions.append(defn)
+        self.tags.append(sys.intern(tags))
+        self.doc_tags.append(doc_tags)
+        self.alternatives.append(alternatives)
+        self.types.append(entryType)
+        self.widths.append(width)
+        self.lines.append(line)
+        if width < 2:
+            return
+        if acr:
+            self._by_term.setdefault(acr, []).append(row)
+        self._by_type.setdefault(entryType, []).append(row)
+        for tag in set(tags.split()):
+            self._by_tag.setdefault(sys.intern(tag), []).append(row)
+        for alt in alternatives:
+            self._by_alternative.setdefault(alt, []).append(row)
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    @classmethod
+    def from_csv(cls, filename: str, strict: bool = True) -> "GlossaryStore":
+        """Read a glossarydefs.csv file.
+
+        Raises `FileNotFoundError` if the file does not exist. ``strict`` is
+        as for the constructor.
+        """
+        import csv
+
+        with open(filename, encoding="utf-8") as fd:
+            reader = csv.reader(fd, delimiter=",", quotechar='"')
+            next(reader, None)  # There is a header line
+            return cls(filename, reader, strict)
+
+    @classmethod
+    def load(cls, filename: str) -> "GlossaryStore":
+        """Return the store for a file, reading it only if it has not been
+        read before or has changed since.
+        """
+        stat = os.stat(filename)
+        key = (os.path.abspath(filename), stat.st_mtime_ns, stat.st_size)
+        store = _glossary_stores.get(key[0])
+        if store is None or store[0] != key:
+            store = (key, cls.from_csv(filename))
+            _glossary_stores[key[0]] = store
+        return store[1]
+
+    def rows_for_term(self, term: str) -> list[int]:
+        """Return the rows defining a term, in file order."""
+        return self._by_term.get(term, [])
+
+    def rows_with_tag(self, tag: str) -> list[int]:
+        """Return the rows with a tag, in file order."""
+        return self._by_tag.get(tag, [])
+
+    def rows_of_type(self, entryType: str) -> list[int]:
+        """Return the rows of a type, ``A`` or ``G``, in file order."""
+        return self._by_type.get(entryType, [])
+
+    def rows_for_alternative(self, term: str) -> list[int]:
+        """Return the rows listing a term as an associated acronym or
+        alternative term, in file order.
+        """
+        return self._by_alternative.get(term, [])
+
+    def select(
+        self,
+        utags: set[str] | None,
+        glossary: bool = True,
+        init: dict[str, set[tuple[str, str]]] | None = None,
+    ) -> dict[str, set[tuple[str, str]]]:
+        """Pick a definition for each term.
+
+        The first definition of a term is used unless a later one has one of
+        the given tags, in which case the last of those is used. A
+        definition in ``init`` is only replaced by a tagged one.
+
+        Parameters
+        ----------
+        utags : `set` [`str`]
+            Tags to select between definitions.
+        glossary : `bool`, optional
+            If `False` glossary (type ``G``) entries are left out.
+        init : `dict`, optional
+            Initial definitions to augment.
+
+        Returns
+        -------
+        definitions : `dict`
+            Dictionary with the terms as keys. The values are sets
+            containing the selected definition and its type.
+        """
+        definitions = {} if init is None else init.copy()
+        tagged: set[int] = set()
+        for tag in utags or ():
+            tagged.update(self.rows_with_tag(tag))
+
+        # New terms are added in the order they first appear in the file.
+        added: list[tuple[int, str, int]] = []
+        for acr, rows in self._by_term.items():
+            if not glossary:
+                rows = [r for r in rows if self.types[r] != "G"]
+                if not rows:
+                    continue
+            chosen = [r for r in rows if r in tagged] if tagged else []
+            if chosen:
+                row = chosen[-1]
+            elif definitions.get(acr):
+                continue
+            else:
+                row = rows[0]
+            if acr in definitions:
+                definitions[acr] = {(self.definitions[row], self.types[row])}
+            else:
+                added.append((rows[0], acr, row))
+        for _, acr, row in sorted(added):
+            definitions[acr] = {(self.definitions[row], self.types[row])}
+        return definitions
+
+
+# Stores already read, keyed on absolute path. The modification time and size
+# are kept with each store to spot changed files.
+_glossary_stores: dict[str, tuple[tuple[str, int, int], GlossaryStore]] = {}
+
+
+def read_glossarydef(
+    filename: str, utags: set[str] | None, init: dict[str, set[tuple[str, str]]] | None = None
+) -> dict[str, set[tuple[str, str]]]:
+    """Read glossary  definitions from LSST format glossarydefs.csv file.
+
+    Parameters
+    ----------
+    filename : `str`
+        Path to LSST  format  glossary file. This is a csv file with the
+        name, definition, tags etc ..
+    utags : `set'
+        List of tags supplied by user to decide which definition to keep when
+        there are many.
+    init : `dict`
+        Initial definitions to augment with the content from this file.
+
+    Returns
+    -------
+    acronyms : `dict`
+        Dictionary with the acronyms as keys. The values are sets containing
+        one or more definition associated with that acronym.
+
+    Notes
+    -----
+    The file is only read the first time, see `GlossaryStore.load`.
+    """
+    return GlossaryStore.load(filename).select(utags, doGlossary, init)
+
+
+def read_myacronyms(
+    filename: str = "myacronyms.txt",
+    allow_duplicates: bool = False,
+    defaults: dict[str, tuple[str, str]] | None = None,
+    utags: set[str] | None = None,
+) -> dict[str, tuple[str, str]]:
+    """Read the supplied file and extract acronyms or glossary entries.
+
+    File must contain lines in format if it is myacronyms.txt :
+
+    ACRONYM:Definition
+
+    but may be of the full glossarydef format if it is myglossarydefs.csv:
+
+    ENTRY,Definition,TAGs,Doc Tags, Alternative terms ,Type
+
+    The last entry, Type,  being A for acronym, G for glossary entry.
+
+
+    A warning is issued if a duplicate identical definition is found in the
+    simple format (for only acronyms). It is an error for the same acronym
+    to have multiple differing entries.
+
+    Parameters
+    ----------
+    filename : `str`
+        Name of file to open.
+    defaults : `dict`, optional
+        `dict` containing default values to seed the returned definitions.
+        The caller's dictionary will not be updated.
+        Items in the current file override the values from the defaults
+        without warning.
+
+    Returns
+    -------
+    definitions : `dict`
+        Dictionary with acronym as key and definition as value.
+    """
+    definitions: dict[str, tuple[str, str]] = {}
+    if filename.endswith(".csv"):
+        localdefs = read_glossarydef(filename, utags)
+        # flatten the set to a single entry for each glossarydef
+        definitions = {d: options.pop() for d, options in localdefs.items()}
+    else:
+        with open(filename) as fd:
+            for line in fd:
+                acr, defn = _parse_line(line)
+                if acr is None:
+                    continue
+                if defn is None:  # for mypy.
+                    continue
+
+                if acr in definitions:
+                    if defn != definitions[acr][1]:
+                        raise RuntimeError(f"Duplicate definitions of {acr} differ in {filename}")
+                    else:
+                        warnings.warn(
+                            UserWarning(
+                                f"Entry {acr} exists multiple times"
+                                f" with same definition in {filename}, you may"
+                                " want to try using a tag (-t)"
+                            ),
+                            stacklevel=1,
+                        )
+                # myacronyms will contains by definition only acronyms
+                definitions[acr] = (defn, "A")
+
+    # Merge with the defaults
+    if defaults is None:
+        combined = definitions
+    else:
+        combined = defaults.copy()
+        combined.update(definitions)
+
+    return combined
+
+
+def read_skip_acronyms(file_name: str = "skipacronyms.txt") -> set[str]:
+    """Read the supplied file to obtain a list of terms to skip.
+
+    File must contain lines in format of one term per line. Repeat
+    values are ignored.
+
+    Parameters
+    ----------
+    file_name
+        Name of file to open. The file does not need to exist.
+
+    Returns
+    -------
+    skip : `set`
+        Set containing terms to be skipped.
+    """
+    skip: set[str] = set()
+    if not os.path.exists(file_name):
+        return skip
+
+    with open(file_name) as fd:
+        for line in fd:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("#"):  # comment
+                continue
+
+            skip.add(line)
+    return skip
+
+
+def _is_word_char(char: str) -> bool:
+    r"""Return `True` if ``char`` is a regex ``\w`` character."""
+    return char.isalnum() or char == "_"
+
+
+def is_nonstandard(acr: str) -> bool:
+    """Return `True` if the term does not look like a "normal" acronym.
+
+    Terms with lower case characters, numbers or special characters, and
+    single characters, can not be found with `CAP_ACRONYM` so they have to
+    be searched for explicitly.
+    """
+    return not acr.isupper() or not acr.isalpha() or len(acr) == 1
+
+
+_TrieNode: TypeAlias = dict[str, "_TrieNode"]
+
+
+class AcronymMatcher:
+    r"""Find a fixed set of terms in text in a single left to right pass.
+
+    The terms are held in a character trie. The text is scanned once and at
+    each word boundary the longest term that also ends on a word boundary is
+    taken, scanning resumes after it. This gives the same result as a
+    ``\b(term1|term2|...)\b`` regular expression with the alternatives sorted
+    by decreasing length, but does not depend on the number of terms.
+
+    Parameters
+    ----------
+    terms : `~collections.abc.Iterable` [`str`]
+        Terms to search for.
+    """
+
+    _END = ""  # Key marking a complete term in the trie, never a character.
+
+    def __init__(self, terms: Iterable[str]) -> None:
+        self.terms = frozenset(t for t in terms if t)
+        self.max_length = max((len(t) for t in self.terms), default=0)
+        self._trie: _TrieNode = {}
+        for term in self.terms:
+            node = self._trie
+            for char in term:
+                node = node.setdefault(char, {})
+            node[self._END] = {}
+        # Only positions on a word boundary that start a term are worth
+        # walking the trie from.
+        first = self.first_chars
+        self._start = re.compile(r"\b[" + re.escape(first) + "]") if first else None
+
+    @property
+    def first_chars(self) -> str:
+        """The characters that terms start with."""
+        return "".join(sorted(self._trie))
+
+    def scan(self, text: str) -> tuple[set[str], str]:
+        """Find the terms in the text and remove them.
+
+        Parameters
+        ----------
+        text : `str`
+            Text to search.
+
+        Returns
+        -------
+        matches : `set` [`str`]
+            Terms found in the text.
+        remainder : `str`
+            The text with every matched occurrence removed.
+        """
+        matches, remainder, _ = self.scan_prefix(text, 0, len(text))
+        return matches, remainder
+
+    def scan_prefix(self, text: str, start: int, stop: int) -> tuple[set[str], str, int]:
+        """Find and remove the terms that start between two positions.
+
+        This allows text to be scanned in chunks with the same result as
+        scanning it all at once. The character before ``start``, if any, is
+        only used to find word boundaries, and unless ``stop`` is the end of
+        the text there must be at least `max_length` + 1 characters after it.
+
+        Parameters
+        ----------
+        text : `str`
+            Text to search.
+        start : `int`
+            Position to start scanning at.
+        stop : `int`
+            Terms starting at or after this position are not searched for.
+
+        Returns
+        -------
+        matches : `set` [`str`]
+            Terms found in the text.
+        remainder : `str`
+            The text from ``start`` to ``end`` with every matched occurrence
+            removed.
+        end : `int`
+            Position to start scanning the next chunk at. This is ``stop``
+            unless a term extends past it.
+        """
+        matches: set[str] = set()
+        if self._start is None:
+            return matches, text[start:stop], stop
+
+        pieces = []
+        kept = start
+        size = len(text)
+        pos = start
+        while (found := self._start.search(text, pos, stop)) is not None:
+            begin = found.start()
+            end = self._longest(text, begin, size)
+            if end < 0:
+                pos = begin + 1
+                continue
+            matches.add(text[begin:end])
+            pieces.append(text[kept:begin])
+            kept = pos = end
+            if pos >= stop:
+                break
+        end = max(kept, stop)
+        pieces.append(text[kept:end])
+        return matches, "".join(pieces), end
+
+    def finditer(self, text: str) -> Iterator[tuple[int, int]]:
+        """Yield the start and end of each term that `scan` finds."""
+        if self._start is None:
+            return
+        size = len(text)
+        pos = 0
+        while (found := self._start.search(text, pos)) is not None:
+            begin = found.start()
+            end = self._longest(text, begin, size)
+            if end < 0:
+                pos = begin + 1
+                continue
+            yield begin, end
+            pos = end
+
+    def _longest(self, text: str, start: int, size: int) -> int:
+        """Return the end of the longest term at ``start`` or -1."""
+        best = -1
+        for best in self._ends(text, start, size):  # noqa: B007
+            pass
+        return best
+
+    def _ends(self, text: str, start: int, size: int) -> Iterator[int]:
+        """Yield the end of each term at ``start``, shortest first."""
+        node = self._trie
+        pos = start
+        while pos < size:
+            child = node.get(text[pos])
+            if child is None:
+                break
+            node = child
+            pos += 1
+            if self._END in node:
+                # The term must end on a word boundary.
+                before = _is_word_char(text[pos - 1])
+                after = pos < size and _is_word_char(text[pos])
+                if before != after:
+                    yield pos
+
+    def terms_at(self, text: str, start: int) -> list[str]:
+        """Return every term that starts at ``start`` in the text.
+
+        Unlike `scan` there is no requirement for a word boundary at the
+        start of the term.
+        """
+        return [text[start:end] for end in self._ends(text, start, len(text))]
+
+    def findall(self, text: str) -> set[str]:
+        """Return the terms found in the text."""
+        return self.scan(text)[0]
+
+
+def find_matches_per_line(
+    filename: str, acronyms: set[str], ignore_str: str = " %"
+) -> tuple[set[str], set[str]]:
+    """Return list of matching acronyms in file.
+
+    Parameters
+    ----------
+    filename : `str`
+        Path to file.
+    acronyms : `set`
+        List of possible acronyms present in file.
+    ignore_str : `str`, optional
+        Anything from this string on in a line is not searched.
+        Every line is searched if set to None. Default is tex comment.
+
+    Returns
+    -------
+    matches : `set`
+        List of matching acronyms from supplied list.
+    missing : `set`
+        List of acronyms used but not matched.
+    """
+    # Now to test every acronym. We cannot use a simple "in"
+    # because we do not want DMS to match DMS and DMSST
+    matcher = AcronymMatcher(acronyms)
+
+    matches = set()
+    with open(filename) as fd:
+        for line in fd:
+            if ignore_str:
+                posn = line.find(ignore_str)
+                if posn > -1:
+                    line = line[:posn]
+            matches.update(matcher.findall(line))
+
+    return matches, set()
+
+
+def find_matches_combo(
+    filename: str,
+    acronyms: set[str],
+    ignore_str: str = " %",
+    matcher: AcronymMatcher | None = None,
+    known: Set[str] | None = None,
+) -> tuple[set[str], set[str]]:
+    """Return list of matching acronyms in file.
+
+    Parameters
+    ----------
+    filename : `str`
+        Path to file.
+    acronyms : `set`
+        List of possible acronyms present in file.
+    ignore_str : `str`, optional
+        Anything from this string on in a line is not searched.
+        Every line is searched if set to None. Default is tex comment.
+        Only used if pandoc is not used.
+    matcher : `AcronymMatcher`, optional
+        Matcher for the nonstandard terms in ``acronyms``. Built from
+        ``acronyms`` if not given; pass one in when scanning many files.
+    known : `~collections.abc.Set` [`str`], optional
+        Terms never reported as missing, the defined and skipped terms.
+        Defaults to ``acronyms``.
+
+    Returns
+    -------
+    matches : `set`
+        List of matching acronyms from supplied list.
+    missing : `set`
+        Set of acronyms found in the text but that are not known.
+    """
+    if get_pypandoc() is None:
+        # Stream the file so that large documents are never held in memory.
+        with open(filename) as fd:
+            return find_matches_stream(fd, acronyms, matcher, ignore_str, known=known)
+    text = read_tex_text(filename, ignore_str)
+    return find_matches_text(text, acronyms, matcher, known)
+
+
+def read_tex_text(filename: str, ignore_str: str = " %") -> str:
+    """Read a tex file into a single string ready for matching.
+
+    Parameters
+    ----------
+    filename : `str`
+        Path to file.
+    ignore_str : `str`, optional
+        Anything from this string on in a line is not searched.
+        Every line is searched if set to None. Default is tex comment.
+        Only used if pandoc is not used.
+
+    Returns
+    -------
+    text : `str`
+        Content of the file with comments and definitions removed.
+    """
+    pypandoc = get_pypandoc()
+    if pypandoc is not None:
+        # Use markdown rather than plain text because
+        # for plain text \textbf{Int} is converted to "INT"
+        # for emphasis.
+        # \gls{XXX} however is completely removed
+        text = pypandoc.convert_file(filename, "markdown", format="latex")
+    else:
+        # Read the content of the file into a single string
+        with open(filename) as fd:
+            text = clean_tex_lines(fd, ignore_str)
+    return text
+
+
+def convert_tex_files(
+    texfiles: Iterable[str], cache_dir: str | None = None, jobs: int | None = None
+) -> dict[str, str]:
+    """Convert tex files to markdown with a pool of pandoc processes.
+
+    Each conversion starts a pandoc process so rather than do that one file
+    at a time the conversions run in parallel. Converted text is cached
+    keyed on the content of the file and the pandoc version so unchanged
+    files are never converted again.
+
+    Parameters
+    ----------
+    texfiles : `~collections.abc.Iterable` [`str`]
+        Paths to the files.
+    cache_dir : `str`, optional
+        Directory holding previously converted files. No cache is used if
+        `None`.
+    jobs : `int`, optional
+        Maximum number of pandoc processes to run at once. Defaults to the
+        number of CPUs.
+
+    Returns
+    -------
+    texts : `dict` [`str`, `str`]
+        Markdown text of each file, in the order given.
+    """
+    import concurrent.futures
+
+    pypandoc = get_pypandoc()
+    if pypandoc is None:
+        raise RuntimeError("pandoc is not available")
+    version = pypandoc.get_pandoc_version()
+
+    texts: dict[str, str] = {}
+    keys: dict[str, str] = {}
+    todo = []
+    for filename in texfiles:
+        keys[filename] = _cache_key([filename], "markdown", version)
+        cached = _read_cache(cache_dir, keys[filename])
+        if isinstance(cached, str):
+            texts[filename] = cached
+        else:
+            # Placeholder keeps the files in the order given.
+            texts[filename] = ""
+            todo.append(filename)
+
+    def convert(filename: str) -> str:
+        return pypandoc.convert_file(filename, "markdown", format="latex")
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+        for filename, text in zip(todo, pool.map(convert, todo), strict=True):
+            texts[filename] = text
+            _write_cache(cache_dir, keys[filename], text)
+    return texts
+
+
+def clean_tex_lines(lines: Iterable[str], ignore_str: str = " %") -> str:
+    """Join tex lines into a single string dropping comments and
+    definitions.
+
+    Parameters
+    ----------
+    lines : `~collections.abc.Iterable` [`str`]
+        Lines of tex.
+    ignore_str : `str`, optional
+        Anything from this string on in a line is not searched.
+        Every line is searched if set to None. Default is tex comment.
+
+    Returns
+    -------
+    text : `str`
+        The cleaned and escaped lines joined by spaces.
+    """
+    return " ".join(iter_clean_tex_lines(lines, ignore_str))
+
+
+def iter_clean_tex_lines(lines: Iterable[str], ignore_str: str = " %") -> Iterator[str]:
+    """Yield the tex lines that should be searched, cleaned and escaped.
+
+    See `clean_tex_lines`.
+    """
+    for line in lines:
+        if ignore_str:
+            posn = line.find(ignore_str)
+            if posn > -1:
+                line = line[:posn]
+        line = line.strip()
+
+        # Latex specific ignore
+        if (
+            line.startswith(r"\def")
+            or line.startswith(r"\newcommand")
+            or line.startswith(r"\renewcommand")
+            or line.startswith(r"\documentclass")
+            or line.startswith("%")
+        ):
+            continue
+        yield escape_for_tex(line)
+
+
+def find_matches_text(
+    text: str,
+    acronyms: set[str],
+    matcher: AcronymMatcher | None = None,
+    known: Set[str] | None = None,
+) -> tuple[set[str], set[str]]:
+    """Return the matching acronyms in some text.
+
+    Parameters
+    ----------
+    text : `str`
+        Text to search, as returned by `read_tex_text`.
+    acronyms : `set`
+        List of possible acronyms present in the text.
+    matcher : `AcronymMatcher`, optional
+        Matcher for the nonstandard terms in ``acronyms``.
+    known : `~collections.abc.Set` [`str`], optional
+        Terms never reported as missing, the defined and skipped terms.
+        Defaults to ``acronyms``.
+
+    Returns
+    -------
+    matches : `set`
+        List of matching acronyms from supplied list.
+    missing : `set`
+        Set of acronyms found in the text but that are not known.
+    """
+    # Do two passes. First look for usages of acronyms that have lower
+    # case characters, number or special characters.
+    # These do not look like "normal" acronyms so special case them.
+    # Also single character acronyms (which should probably be banned)
+    # CAP_ACRONYM cannot be used here since it search for substrings
+    if matcher is None:
+        matcher = AcronymMatcher(a for a in acronyms if is_nonstandard(a))
+
+    # The matcher takes the longest term at each position so that R&D
+    # matches before R and D, and "metric value" before "metric". Matched
+    # terms are removed from the text in the same pass to prevent double
+    # matches where "LSST-DA" matches "LSST-DA" and then matches LSST and
+    # DA separately.
+    matches, text = matcher.scan(text)
+
+    missing: set[str] = set()
+    _classify_used(text, acronyms, acronyms if known is None else known, matches, missing)
+    return matches, missing
+
+
+def find_matches_stream(
+    lines: Iterable[str],
+    acronyms: set[str],
+    matcher: AcronymMatcher | None = None,
+    ignore_str: str = " %",
+    chunk_size: int = 65536,
+    known: Set[str] | None = None,
+) -> tuple[set[str], set[str]]:
+    """Return the matching acronyms in tex read a chunk at a time.
+
+    The result is the same as `find_matches_text` on the output of
+    `read_tex_text` but the text is never held in memory all at once. Each
+    chunk is scanned for terms up to the point where a term could run into
+    the next chunk; the rest is carried over. The text left after removing
+    the terms is only searched for acronyms up to a character that no
+    acronym or ``gls{}`` can span.
+
+    Parameters
+    ----------
+    lines : `~collections.abc.Iterable` [`str`]
+        Lines of tex, such as an open file.
+    acronyms : `set`
+        List of possible acronyms present in the text.
+    matcher : `AcronymMatcher`, optional
+        Matcher for the nonstandard terms in ``acronyms``.
+    ignore_str : `str`, optional
+        Anything from this string on in a line is not searched.
+    chunk_size : `int`, optional
+        Approximate number of characters to scan at a time.
+    known : `~collections.abc.Set` [`str`], optional
+        Terms never reported as missing, the defined and skipped terms.
+        Defaults to ``acronyms``.
+
+    Returns
+    -------
+    matches : `set`
+        List of matching acronyms from supplied list.
+    missing : `set`
+        Set of acronyms found in the text but that are not known.
+    """
+    if matcher is None:
+        matcher = AcronymMatcher(a for a in acronyms if is_nonstandard(a))
+    if known is None:
+        known = acronyms
+    # Characters needed after the last position scanned in a chunk.
+    lookahead = matcher.max_length + 1
+
+    matches: set[str] = set()
+    missing: set[str] = set()
+    # Cleaned text not yet scanned for terms. The first character of a
+    # carried over chunk was already scanned and is only there so word
+    # boundaries can be found.
+    pending: list[str] = []
+    pending_size = 0
+    start = 0
+    # Text with the terms removed that has not been searched for acronyms.
+    remainder = ""
+
+    def scan(text: str, stop: int) -> int:
+        nonlocal remainder
+        found, stripped, end = matcher.scan_prefix(text, start, stop)
+        matches.update(found)
+        remainder += stripped
+        return end
+
+    for line in iter_clean_tex_lines(lines, ignore_str):
+        if pending_size:
+            # Lines are joined with a space.
+            pending.append(" ")
+            pending_size += 1
+        pending.append(line)
+        pending_size += len(line)
+        if pending_size - start < chunk_size + lookahead:
+            continue
+
+        text = "".join(pending)
+        end = scan(text, len(text) - lookahead)
+        pending = [text[end - 1 :]]
+        pending_size = len(pending[0])
+        start = 1
+
+        cut = _safe_cut(remainder)
+        _classify_used(remainder[:cut], acronyms, known, matches, missing)
+        remainder = remainder[cut:]
+
+    text = "".join(pending)
+    scan(text, len(text))
+    _classify_used(remainder, acronyms, known, matches, missing)
+    return matches, missing
+
+
+def _safe_cut(text: str) -> int:
+    """Return the last position in the text that no acronym or ``gls{}``
+    found by `_classify_used` can span, 0 if there is none.
+    """
+    for cut in range(len(text), 0, -1):
+        char = text[cut - 1]
+        if not (_is_word_char(char) or char.isspace() or char == "{"):
+            return cut
+    return 0
+
+
+def _classify_used(
+    text: str, acronyms: Set[str], known: Set[str], matches: set[str], missing: set[str]
+) -> None:
+    """Add the acronym-like strings and gls entries in the text that are
+    defined to ``matches`` and those that are not known to ``missing``.
+
+    Each string found is looked up as it is found rather than gathering
+    them all first, most are repeats or defined terms that need not be
+    kept.
+    """
+    # Now look for all acronym-like strings in the text, defined as a
+    # collection of 2 or more upper case characters with word boundaries
+    # either side, and with glossaries the gls entries, using the group
+    # ( ) to catch what's between { }.
+    # still a problems for COMPOUND ENTRIES like NASA ROSES  ..
+    # ROSES is tagged as missing
+    patterns = [(CAP_ACRONYM, 0)]
+    if doGlossary:
+        patterns.append((GLS_ENTRY, 1))
+    for pattern, group in patterns:
+        for found in pattern.finditer(text):
+            term = found[group]
+            if term in acronyms:
+                matches.add(term)
+            if term not in known:
+                missing.add(term)
+
+
+find_matches = find_matches_combo
+
+
+def escape_for_tex(text: str) -> str:
+    """Escape tex nasties and return new string.
+    But watch out for double whammies.
+    """
+    for c in specialChars:
+        text = text.replace(c, rf"\{c}")
+        text = text.replace(rf"\\{c}", rf"\{c}")
+    return text
+
+
+def write_latex_glossary(acronyms: list[tuple[str, tuple[str, str]]], fd: IO | None = sys.stdout) -> None:
+    """Write a glossary file with newglossaryitem per definition  -
+    or new acronym if it is type A for acronym.
+
+    Parameters
+    ----------
+    acronyms : `list`
+        List of 2-tuples with acronym and definition.
+    fd : `file`, optional
+    """
+    print(
+        f"% DO NOT EDIT - generated by {sys.argv[0]} from https://lsst-texmf.lsst.io/.",
+        file=fd,
+    )
+    for acr, defn in acronyms:
+        print(glossary_entry(acr, defn), file=fd)
+
+
+def glossary_entry(acr: str, defn: tuple[str, str]) -> str:
+    r"""Return the glossary definition of a single acronym or entry.
+
+    Parameters
+    ----------
+    acr : `str`
+        Acronym or glossary entry.
+    defn : `tuple` [`str`, `str`]
+        Definition and type, A for acronym and G for glossary.
+
+    Returns
+    -------
+    entry : `str`
+        A ``\newacronym`` or ``\newglossaryentry`` line.
+    """
+    definition = escape_for_tex(defn[0])
+    # entry has a lookup and a display version
+    # the display one needs escaping
+    acr2 = escape_for_tex(acr)
+    if defn[1] == "A":
+        return f"\\newacronym{{{acr}}} {{{acr2}}} {{{definition}}}"
+    return f"\\newglossaryentry{{{acr}}} {{name={{{acr2}}}, description={{{definition}}}}}"
+
+
+def write_latex_table(
+    acronyms: list[tuple[str, tuple[str, str]]],
+    dotex: bool = True,
+    dorst: bool = False,
+    doaastex: bool = False,
+    fd: IO | None = sys.stdout,
+) -> None:
+    """Write latex table to supplied file descriptor.
+
+    Parameters
+    ----------
+    acronyms : `list`
+        List of 2-tuples with acronym and definition.
+    """
+    sep = " & "
+    end = r" \\\hline"
+    if dorst:
+        print(r""".. _table-label: """, file=fd)
+        print(r"""""", file=fd)
+        print(r"""======= ===========""", file=fd)
+
+    if dotex:
+        print(
+            r"""\addtocounter{table}{-1}
+\begin{longtable}{p{0.145\textwidth}p{0.8\textwidth}}\hline
+\textbf{Acronym} & \textbf{Description}  \\\hline
+""",
+            file=fd,
+        )
+    elif doaastex:
+        print(
+            r"""\addtocounter{table}{-1}
+\startlongtable
+\begin{deluxetable*}{l l}
+\tabletypesize{\footnotesize} % adjust if you need smaller text
+\tablewidth{0pt}
+\tablehead{
+\colhead{Acronym} & \colhead{Description}
+}
+\startdata""",
+            file=fd,
+        )
+    else:
+        print("Acronym\tDescription", file=fd)
+        if dorst:
+            print(r"""======= ===========""", file=fd)
+        sep = "\t"
+        end = ""
+    for acr, (defn, _) in acronyms:
+        acr = escape_for_tex(acr)
+        print(f"{acr}{sep}{defn}{end}", file=fd)
+    if dotex:
+        print(r"\end{longtable}", file=fd)
+    elif doaastex:
+        print(
+            r"""\enddata
+\end{deluxetable*}
+""",
+            file=fd,
+        )
+    if dorst:
+        print(r"""======= ===========""", file=fd)
+
+
+def setup_paths() -> tuple[str, str]:
+    """Calculate the paths to glossary definitions and skip files."""
+    defaults_dir = os.path.join(os.path.dirname(__file__), os.path.pardir, "etc")
+    lsst_glossary_path = os.path.join(defaults_dir, "glossarydefs.csv")
+    global_skip_path = os.path.join(defaults_dir, "skipacronyms.txt")
+    return (lsst_glossary_path, global_skip_path)
+
+
+class GlossaryIndex(NamedTuple):
+    """Definitions and matcher needed to scan documents for acronyms.
+
+    Everything in here is derived from the glossary, local definition and
+    skip files so it can be pickled and reused while those are unchanged.
+    """
+
+    lsst_definitions: dict[str, set[tuple[str, str]]]
+    """Definitions from glossarydefs.csv with skipped terms removed."""
+
+    local_definitions: dict[str, tuple[str, str]]
+    """Definitions from myacronyms.txt or myglossarydefs.csv."""
+
+    skip: set[str]
+    """Terms from the global and local skip files."""
+
+    acronyms: set[str]
+    """Every defined term."""
+
+    matcher: AcronymMatcher
+    """Matcher for the nonstandard terms in ``acronyms``."""
+
+    known: frozenset[str]
+    """Every defined or skipped term, so an acronym found in a document can
+    be classified with a single lookup.
+    """
+
+    digest: str
+    """Hash of ``acronyms`` and ``skip``, identifies the terms a document
+    was scanned for."""
+
+
+def default_cache_dir() -> str:
+    """Return the directory used to cache compiled glossary data."""
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "lsst-texmf", "acronyms")
+
+
+def _cache_key(paths: Iterable[str], *extra: object) -> str:
+    """Hash the content of the given files and any extra values.
+
+    Only the content of the files is used, not their names. Missing files
+    hash differently from empty ones.
+    """
+    # Pickled classes are looked up by module so that is part of the key.
+    digest = hashlib.sha256(repr((CACHE_VERSION, __name__, extra)).encode())
+    for path in paths:
+        try:
+            with open(path, "rb") as fd:
+                content = fd.read()
+        except FileNotFoundError:
+            digest.update(b"missing\0")
+        else:
+            digest.update(f"{len(content)}\0".encode())
+            digest.update(content)
+    return digest.hexdigest()
+
+
+def _read_cache(cache_dir: str | None, key: str) -> object | None:
+    """Return the object stored under ``key`` or `None`."""
+    if cache_dir is None:
+        return None
+    import pickle
+
+    path = os.path.join(cache_dir, f"{key}.pickle")
+    try:
+        with open(path, "rb") as fd:
+            value = pickle.load(fd)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+        return None
+    # Mark the entry as used so that it is pruned last.
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+    return value
+
+
+# Bytes written to each cache directory since it was last pruned.
+_cache_unpruned: dict[str, int] = {}
+
+
+def prune_cache(cache_dir: str, max_bytes: int = CACHE_MAX_BYTES) -> int:
+    """Delete the least recently used cache entries until the rest take
+    no more than ``max_bytes``.
+
+    Parameters
+    ----------
+    cache_dir : `str`
+        The cache directory.
+    max_bytes : `int`, optional
+        Largest total size of the entries to keep.
+
+    Returns
+    -------
+    removed : `int`
+        Number of entries deleted.
+    """
+    entries = []
+    try:
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if entry.name.endswith(".pickle") and entry.is_file():
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+    except OSError:
+        return 0
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+    return removed
+
+
+def _write_cache(cache_dir: str | None, key: str, value: object) -> None:
+    """Store ``value`` under ``key``, failures are not fatal."""
+    if cache_dir is None:
+        return
+    import pickle
+    import tempfile
+
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with tempfile.NamedTemporaryFile("wb", dir=cache_dir, delete=False) as fd:
+            pickle.dump(value, fd, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(fd.name, os.path.join(cache_dir, f"{key}.pickle"))
+        size = os.path.getsize(os.path.join(cache_dir, f"{key}.pickle"))
+    except OSError as ex:
+        print(f"Unable to write cache in {cache_dir}: {ex}", file=sys.stderr)
+        return
+    # Prune on the first write of a run and then every time an eighth of
+    # the limit has been written, rather than listing the directory on
+    # every write.
+    written = _cache_unpruned.get(cache_dir)
+    if written is None or written + size > CACHE_MAX_BYTES // 8:
+        prune_cache(cache_dir, CACHE_MAX_BYTES)
+        _cache_unpruned[cache_dir] = 0
+    else:
+        _cache_unpruned[cache_dir] = written + size
+
+
+def load_glossary_index(
+    utags: set[str], writeallacronyms: bool = False, cache_dir: str | None = None
+) -> GlossaryIndex:
+    """Read the glossary, local definitions and skip files.
+
+    Parameters
+    ----------
+    utags : `set`
+        Tags used to select between definitions.
+    writeallacronyms : `bool`, optional
+        If `True` skipped terms are kept.
+    cache_dir : `str`, optional
+        Directory holding previously compiled indexes. The index is reused
+        if none of the input files, tags or options have changed. No cache is
+        used if `None`.
+
+    Returns
+    -------
+    index : `GlossaryIndex`
+        Definitions and matcher.
+    """
+    lsst_glossary_path, global_skip_path = setup_paths()
+    key = _cache_key(
+        [lsst_glossary_path, global_skip_path, "skipacronyms.txt", "myacronyms.txt", "myglossarydefs.csv"],
+        sorted(utags),
+        doGlossary,
+        writeallacronyms,
+    )
+    if key in _indexes:
+        return _indexes[key]
+    cached = _read_cache(cache_dir, key)
+    if isinstance(cached, GlossaryIndex):
+        _indexes[key] = cached
+        return cached
+
+    # Read the full set
+    lsst_definitions = read_glossarydef(lsst_glossary_path, utags)
+
+    # Read the local set  myacronyms.txt or  myglossarydefs.csv
+    try:
+        local_definitions = read_myacronyms()
+    except FileNotFoundError:
+        try:
+            local_definitions = read_myacronyms(filename="myglossarydefs.csv", utags=utags)
+        except FileNotFoundError:
+            local_definitions = {}
+
+    # Get list of acronyms to ignore
+    global_skip = read_skip_acronyms(global_skip_path)
+
+    try:
+        # Read optional local skip file
+        local_skip = read_skip_acronyms()
+    except FileNotFoundError:
+        skip = global_skip
+    else:
+        skip = global_skip | local_skip
+
+    # Remove the skipped items
+    if not writeallacronyms:
+        for s in skip:
+            if s in local_definitions:
+                local_definitions.pop(s)
+            if s in lsst_definitions:
+                lsst_definitions.pop(s)
+
+    # Master list of all acronyms
+    acronyms = set(lsst_definitions) | set(local_definitions)
+    matcher = AcronymMatcher(a for a in acronyms if is_nonstandard(a))
+
+    known = frozenset(acronyms | skip)
+    digest = hashlib.sha256("\0".join([*sorted(acronyms), "", *sorted(skip)]).encode()).hexdigest()
+    index = GlossaryIndex(lsst_definitions, local_definitions, skip, acronyms, matcher, known, digest)
+    _write_cache(cache_dir, key, index)
+    _indexes[key] = index
+    return index
+
+
+# Indexes already loaded by this process, so that documents processed in one
+# batch with the same tags and local files share them.
+_indexes: dict[str, GlossaryIndex] = {}
+
+
+def attach_definitions(
+    terms: Iterable[str], index: GlossaryIndex, verbose: bool = True
+) -> list[tuple[str, tuple[str, str]]]:
+    """Return the definitions of the given terms sorted by term.
+
+    Local definitions take precedence. If ``verbose`` terms with more than
+    one definition are reported.
+    """
+    results: list[tuple[str, tuple[str, str]]] = []
+    for acr in sorted(terms):
+        if acr in index.local_definitions:
+            results.append((acr, index.local_definitions[acr]))
+        elif acr in index.lsst_definitions:
+            options = index.lsst_definitions[acr]
+            if len(options) > 1 and verbose:
+                print(
+                    f"Entry {acr} exists multiple ({len(options)}) times. Including all definitions.",
+                    file=sys.stderr,
+                )
+            for a in options:
+                results.append((acr, a))
+        else:
+            raise RuntimeError(f"Internal error handling {acr}")
+    return results
+
+
+def converge_glossary(
+    terms: set[str], index: GlossaryIndex, noadorn: bool
+) -> tuple[list[tuple[str, tuple[str, str]]], int]:
+    r"""Find the glossary entries referenced from other glossary entries.
+
+    Definitions use other terms so those need to be in the glossary too.
+    This used to be done by writing :file:`aglossary.tex` and scanning it
+    again until the number of entries stopped changing. Here each entry is
+    rendered and scanned once, when it is first reached, giving the graph of
+    which entries reference which. The rounds of rescanning are then
+    replayed on that graph so the result is the same as before.
+
+    Parameters
+    ----------
+    terms : `set` [`str`]
+        Terms found in the document.
+    index : `GlossaryIndex`
+        Definitions and matcher.
+    noadorn : `bool`
+        If `False` terms in the definitions are marked with ``\gls``.
+
+    Returns
+    -------
+    results : `list`
+        2-tuples of entry and definition to write to the glossary.
+    rounds : `int`
+        The number of times the glossary file would have been rescanned.
+    """
+    entries: dict[str, list[tuple[str, tuple[str, str]]]] = {}
+    references: dict[str, set[str]] = {}
+
+    def visit(todo: set[str]) -> None:
+        # Render and scan only the entries that have not been seen yet.
+        todo = todo - references.keys()
+        if not todo:
+            return
+        results = attach_definitions(todo, index, verbose=False)
+        if not noadorn:
+            results = update_gls_entries(results, index.lsst_definitions)
+        for acr, defn in results:
+            entries.setdefault(acr, []).append((acr, defn))
+        for acr in todo:
+            text = clean_tex_lines(glossary_entry(a, d) for a, d in entries[acr])
+            references[acr] = find_matches_text(text, index.acronyms, index.matcher)[0]
+
+    current = terms
+    count = len(attach_definitions(current, index, verbose=False))
+    rounds = 0
+    while True:
+        visit(current)
+        rounds += 1
+        following: set[str] = set().union(*(references[acr] for acr in current))
+        prevCount, count = count, len(attach_definitions(following, index, verbose=False))
+        current = following
+        # If no glossary items are added we are done
+        if count == prevCount:
+            break
+
+    visit(current)
+    return [entry for acr in sorted(current) for entry in entries[acr]], rounds
+
+
+class FileScan(NamedTuple):
+    """Result of scanning one tex file."""
+
+    filename: str
+    matches: set[str]
+    missing: set[str]
+    seconds: float
+    """Time taken to read and scan the file."""
+    cached: bool = False
+    """Whether the result came from the cache rather than a scan."""
+
+
+# Acronyms and matcher used by _scan_text, set once per worker process.
+_scan_state: tuple[set[str], AcronymMatcher, frozenset[str]] | None = None
+
+
+def _init_scan(acronyms: set[str], matcher: AcronymMatcher, known: frozenset[str], glossary: bool) -> None:
+    """Set the acronyms and matcher to use in this process."""
+    global _scan_state, doGlossary
+    _scan_state = (acronyms, matcher, known)
+    doGlossary = glossary
+
+
+def _scan_text(
+    filename: str, text: str | None, acronyms: set[str], matcher: AcronymMatcher, known: frozenset[str]
+) -> FileScan:
+    """Scan a tex file, reading it unless the text is given."""
+    start = time.perf_counter()
+    if text is not None:
+        matches, missing = find_matches_text(text, acronyms, matcher, known)
+    else:
+        matches, missing = find_matches_combo(filename, acronyms, matcher=matcher, known=known)
+    return FileScan(filename, matches, missing, time.perf_counter() - start)
+
+
+def _scan_in_worker(filename: str, text: str | None) -> FileScan:
+    """Scan a tex file with the acronyms and matcher of this process."""
+    assert _scan_state is not None
+    return _scan_text(filename, text, *_scan_state)
+
+
+def scan_tex_files(
+    texfiles: Iterable[str], index: GlossaryIndex, jobs: int = 1, cache_dir: str | None = None
+) -> list[FileScan]:
+    """Scan tex files for acronyms, optionally in parallel.
+
+    Parameters
+    ----------
+    texfiles : `~collections.abc.Iterable` [`str`]
+        Paths to the files.
+    index : `GlossaryIndex`
+        Definitions and matcher.
+    jobs : `int`, optional
+        Number of processes to scan with. The acronyms and matcher are sent
+        to each process once, when it starts.
+    cache_dir : `str`, optional
+        Directory holding the results of previous scans, keyed on the
+        content of the file and the acronyms searched for. Unchanged files
+        are not scanned again. No cache is used if `None`.
+
+    Returns
+    -------
+    scans : `list` [`FileScan`]
+        Result for each file, in the order given.
+    """
+    scans: dict[int, FileScan] = {}
+    keys: dict[int, str] = {}
+    todo: list[str] = []
+    for i, filename in enumerate(texfiles):
+        keys[i] = _cache_key([filename], "scan", index.digest, doGlossary, get_pypandoc() is not None)
+        cached = _read_cache(cache_dir, keys[i])
+        if isinstance(cached, tuple):
+            matches, missing = cached
+            scans[i] = FileScan(filename, matches, missing, 0.0, cached=True)
+        else:
+            todo.append(filename)
+
+    if get_pypandoc() is not None:
+        converted = convert_tex_files(todo, cache_dir, jobs)
+        texts: list[str | None] = [converted[f] for f in todo]
+    else:
+        texts = [None] * len(todo)
+
+    if jobs <= 1 or len(todo) <= 1:
+        results = [
+            _scan_text(f, t, index.acronyms, index.matcher, index.known)
+            for f, t in zip(todo, texts, strict=True)
+        ]
+    else:
+        import concurrent.futures
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs,
+            initializer=_init_scan,
+            initargs=(index.acronyms, index.matcher, index.known, doGlossary),
+        ) as pool:
+            # map returns results in the order of the files.
+            results = list(pool.map(_scan_in_worker, todo, texts))
+
+    # Fill in the gaps between the cached results in file order.
+    scanned = iter(results)
+    for i in keys:
+        if i not in scans:
+            scans[i] = next(scanned)
+            _write_cache(cache_dir, keys[i], (scans[i].matches, scans[i].missing))
+    return [scans[i] for i in sorted(scans)]
+
+
+def _file_stamp(filename: str) -> tuple[int, int] | None:
+    """Return the modification time and size of a file, `None` if it does
+    not exist.
+    """
+    try:
+        stat = os.stat(filename)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class IncludeGraph(NamedTuple):
+    """The tex files making up a document."""
+
+    root: str
+    files: list[str]
+    """Every file reached from the root, each once, in the order TeX reads
+    them.
+    """
+    includes: dict[str, list[str]]
+    """Files included directly by each file."""
+    missing: list[str]
+    """Included files that could not be found."""
+    stamps: dict[str, tuple[int, int] | None]
+    """Modification time and size of each file the graph depends on,
+    `None` for paths that did not exist.
+    """
+
+    def is_current(self) -> bool:
+        """Return `True` if none of the files have changed."""
+        return all(_file_stamp(path) == stamp for path, stamp in self.stamps.items())
+
+
+def _include_candidates(name: str, directories: Iterable[str]) -> list[str]:
+    """Return the paths TeX would try for an included file, in order."""
+    candidates = []
+    for directory in directories:
+        path = os.path.normpath(os.path.join(directory, name))
+        if not path.endswith(".tex"):
+            candidates.append(f"{path}.tex")
+        candidates.append(path)
+    return list(dict.fromkeys(candidates))
+
+
+def resolve_includes(root: str, cache_dir: str | None = None) -> IncludeGraph:
+    r"""Find the files a document is made of by following its
+    ``\input``, ``\include`` and ``\subfile`` commands.
+
+    Each file is read once however many times it is included. As in TeX,
+    ``\input`` and ``\include`` paths are relative to the directory of the
+    root document and ``\subfile`` paths to the including file, with the
+    other directory tried if the file is not found. Commented out commands
+    are ignored, as are the generated acronym and glossary files.
+
+    Parameters
+    ----------
+    root : `str`
+        Path to the root document.
+    cache_dir : `str`, optional
+        Directory holding previously resolved graphs. A cached graph is used
+        if none of its files have been modified and none of its missing
+        files have appeared. No cache is used if `None`.
+
+    Returns
+    -------
+    graph : `IncludeGraph`
+        The files of the document.
+    """
+    key = _cache_key([], "includes", os.path.abspath(root))
+    cached = _read_cache(cache_dir, key)
+    if isinstance(cached, IncludeGraph) and cached.is_current():
+        return cached
+
+    root = os.path.normpath(root)
+    top = os.path.dirname(root)
+    generated = {glsFile} | {f"acronyms.{mode}" for mode in OUTPUT_MODES}
+    includes: dict[str, list[str]] = {}
+    missing: list[str] = []
+    stamps: dict[str, tuple[int, int] | None] = {}
+    files: list[str] = []
+    # Depth first so the files are in the order TeX reads them.
+    stack = [root]
+    while stack:
+        filename = stack.pop()
+        if filename in includes:
+            continue
+        includes[filename] = []
+        stamps[filename] = _file_stamp(filename)
+        files.append(filename)
+        with open(filename) as fd:
+            text = "".join(TEX_COMMENT.sub("", line) for line in fd)
+        here = os.path.dirname(filename)
+        for command, name in INCLUDE_RE.findall(text):
+            name = name.strip()
+            if os.path.basename(name) in generated or f"{os.path.basename(name)}.tex" in generated:
+                continue
+            bases = (here, top) if command == "subfile" else (top, here)
+            candidates = _include_candidates(name, bases)
+            found = None
+            for candidate in candidates:
+                stamp = _file_stamp(candidate)
+                stamps[candidate] = stamp
+                if stamp is not None:
+                    found = candidate
+                    break
+            if found is None:
+                missing.append(name)
+            else:
+                includes[filename].append(found)
+        stack.extend(reversed(includes[filename]))
+
+    graph = IncludeGraph(root, files, includes, missing, stamps)
+    _write_cache(cache_dir, key, graph)
+    return graph
+
+
+def expand_includes(texfiles: Iterable[str], cache_dir: str | None = None) -> list[str]:
+    """Return the given root documents and every file they include, each
+    once.
+
+    Included files that can not be found are reported. See
+    `resolve_includes`.
+    """
+    files: dict[str, None] = {}
+    for root in texfiles:
+        graph = resolve_includes(root, cache_dir)
+        files.update(dict.fromkeys(graph.files))
+        for name in graph.missing:
+            print(f"Included file not found: {name} (from {root})", file=sys.stderr)
+    return list(files)
+
+
+PROFILE_PASSES = ("nonstandard", "CAP_ACRONYM", "gls")
+"""Passes made over the text to find terms, in order."""
+
+
+class FileProfile(NamedTuple):
+    """Where the terms in a tex file were found and how long it took."""
+
+    filename: str
+    seconds: dict[str, float]
+    """Time taken to read the file and for each of `PROFILE_PASSES`."""
+    sources: list[tuple[str, str, int]]
+    """Term, pass and line number of each use of a term, in pass order."""
+
+
+def profile_tex_file(
+    filename: str, acronyms: set[str], matcher: AcronymMatcher, ignore_str: str = " %"
+) -> FileProfile:
+    """Find the terms in a tex file as `find_matches_text` does, recording
+    the pass and line each one was found by and timing each pass.
+
+    This is much slower than `find_matches_combo` so is only used to
+    explain its results. Pandoc is never used.
+
+    Parameters
+    ----------
+    filename : `str`
+        Path to file.
+    acronyms : `set`
+        List of possible acronyms present in file.
+    matcher : `AcronymMatcher`
+        Matcher for the nonstandard terms in ``acronyms``.
+    ignore_str : `str`, optional
+        Anything from this string on in a line is not searched.
+
+    Returns
+    -------
+    profile : `FileProfile`
+        The terms found, including those with no definition.
+    """
+    import bisect
+
+    seconds: dict[str, float] = {}
+    start = time.perf_counter()
+    # Line number of each line of the text and where it starts.
+    numbers: list[int] = []
+    offsets: list[int] = []
+    pieces: list[str] = []
+    size = 0
+    with open(filename) as fd:
+        for number, line in enumerate(fd, 1):
+            for cleaned in iter_clean_tex_lines((line,), ignore_str):
+                # Lines are joined with a space.
+                offset = size + 1 if pieces else 0
+                numbers.append(number)
+                offsets.append(offset)
+                pieces.append(cleaned)
+                size = offset + len(cleaned)
+    text = " ".join(pieces)
+    seconds["read"] = time.perf_counter() - start
+
+    def line_of(pos: int) -> int:
+        return numbers[bisect.bisect_right(offsets, pos) - 1]
+
+    sources: list[tuple[str, str, int]] = []
+    start = time.perf_counter()
+    # Where each piece of the text left after removing the terms starts, in
+    # that text and in the original.
+    kept_at: list[int] = [0]
+    kept_from: list[int] = [0]
+    remainder: list[str] = []
+    kept = 0
+    for begin, end in matcher.finditer(text):
+        sources.append((text[begin:end], "nonstandard", line_of(begin)))
+        remainder.append(text[kept:begin])
+        kept_at.append(kept_at[-1] + begin - kept)
+        kept_from.append(end)
+        kept = end
+    remainder.append(text[kept:])
+    rest = "".join(remainder)
+    seconds["nonstandard"] = time.perf_counter() - start
+
+    def rest_line_of(pos: int) -> int:
+        i = bisect.bisect_right(kept_at, pos) - 1
+        return line_of(kept_from[i] + pos - kept_at[i])
+
+    start = time.perf_counter()
+    for found in CAP_ACRONYM.finditer(rest):
+        sources.append((found.group(), "CAP_ACRONYM", rest_line_of(found.start())))
+    seconds["CAP_ACRONYM"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    if doGlossary:
+        for found in GLS_ENTRY.finditer(rest):
+            sources.append((found.group(1), "gls", rest_line_of(found.start(1))))
+    seconds["gls"] = time.perf_counter() - start
+    return FileProfile(filename, seconds, sources)
+
+
+def profile_report(
+    profiles: list[FileProfile], phases: dict[str, float], acronyms: set[str], skip: set[str]
+) -> dict[str, Any]:
+    """Gather file profiles into a report that can be written as JSON.
+
+    Parameters
+    ----------
+    profiles : `list` [`FileProfile`]
+        Profile of each file scanned.
+    phases : `dict` [`str`, `float`]
+        Time taken by each phase of `generate`.
+    acronyms : `set`
+        Terms with definitions.
+    skip : `set`
+        Terms not to report as missing a definition.
+
+    Returns
+    -------
+    report : `dict` [`str`, `~typing.Any`]
+        Timings of each phase, each pass and each file, and for each term
+        found the pass that first found it, whether it is defined and
+        every place it was used.
+    """
+    passes = dict.fromkeys(("read", *PROFILE_PASSES), 0.0)
+    files = []
+    terms: dict[str, dict[str, Any]] = {}
+    for profile in profiles:
+        for name, seconds in profile.seconds.items():
+            passes[name] += seconds
+        files.append(
+            {
+                "filename": profile.filename,
+                "seconds": profile.seconds,
+                "uses": len(profile.sources),
+            }
+        )
+        for term, pass_name, line in profile.sources:
+            if term not in terms:
+                status = "defined" if term in acronyms else "skipped" if term in skip else "missing"
+                terms[term] = {"pass": pass_name, "status": status, "sources": []}
+            terms[term]["sources"].append([profile.filename, line, pass_name])
+    return {"phases": phases, "passes": passes, "files": files, "terms": dict(sorted(terms.items()))}
+
+
+def write_profile(report: dict[str, Any], fd: IO = sys.stderr) -> None:
+    """Write a profile report as text."""
+    print("Phase timings:", file=fd)
+    for name, seconds in report["phases"].items():
+        print(f"  {name:14s} {seconds:8.3f}s", file=fd)
+    print("Pass timings:", file=fd)
+    for name, seconds in report["passes"].items():
+        print(f"  {name:14s} {seconds:8.3f}s", file=fd)
+    print("Files, slowest first:", file=fd)
+    for entry in sorted(report["files"], key=lambda e: sum(e["seconds"].values()), reverse=True):
+        detail = ", ".join(f"{name} {seconds:.3f}s" for name, seconds in entry["seconds"].items())
+        total = sum(entry["seconds"].values())
+        print(f"  {total:8.3f}s {entry['filename']} ({entry['uses']} uses: {detail})", file=fd)
+    print("Terms:", file=fd)
+    for term, info in report["terms"].items():
+        filename, line, _ = info["sources"][0]
+        more = len(info["sources"]) - 1
+        where = f"{filename}:{line}" + (f" and {more} more" if more else "")
+        print(f"  {term:20s} {info['status']:8s} {info['pass']:12s} {where}", file=fd)
+
+
+def generate(
+    texfiles: Iterable[str],
+    doGlossary: bool,
+    utags: set[str],
+    dotex: bool,
+    dorst: bool,
+    doaastex: bool,
+    mode: str,
+    noadorn: bool,
+    writeallacronyms: bool = False,
+    cache_dir: str | None = None,
+    converge: bool = False,
+    jobs: int = 1,
+    timing: bool = False,
+    profile: str | None = None,
+) -> int:
+    """Run program and generate acronyms file.
+
+    ``cache_dir`` is the directory holding the compiled glossary index,
+    `None` disables the cache. If ``converge`` is set, glossary entries
+    referenced from the definitions of other entries are also included.
+    The files are scanned with ``jobs`` processes and if ``timing`` is set
+    the time taken for each file is reported. If ``profile`` is set the
+    files are scanned again to find where each term came from and a report
+    of that and of the time taken by each phase and pass is written, as
+    JSON to the named file or as text to stderr if it is ``-``.
+    """
+    if not texfiles:
+        raise RuntimeError("No files supplied.")
+    # A file listed twice is only scanned once.
+    texfiles = list(dict.fromkeys(os.path.normpath(f) for f in texfiles))
+
+    phases: dict[str, float] = {}
+    start = time.perf_counter()
+    index = load_glossary_index(utags, writeallacronyms, cache_dir)
+    skip = index.skip
+    phases["load index"] = time.perf_counter() - start
+
+    # Scan each supplied tex file looking for the acronym
+    matches = set()
+    missing = set()
+    start = time.perf_counter()
+    scans = scan_tex_files(texfiles, index, jobs, cache_dir)
+    for scan in scans:
+        matches.update(scan.matches)
+        missing.update(scan.missing)
+    phases["scan"] = time.perf_counter() - start
+
+    if timing:
+        for scan in sorted(scans, key=lambda scan: scan.seconds, reverse=True):
+            status = " (cached)" if scan.cached else ""
+            print(f"{scan.seconds:8.3f}s {scan.filename}{status}", file=sys.stderr)
+    if cache_dir is not None:
+        hits = sum(scan.cached for scan in scans)
+        print(
+            f"Scan cache: {hits} of {len(scans)} files unchanged, {len(scans) - hits} scanned",
+            file=sys.stderr,
+        )
+
+    print(f"Matched {len(matches)} acronyms", file=sys.stderr)
+
+    # Report missing definitions, skipped terms were never collected
+    report_missing(missing)
+
+    start = time.perf_counter()
+    results = build_entries(matches, index, doGlossary, dotex, doaastex, noadorn, converge)
+    phases["build entries"] = time.perf_counter() - start
+    start = time.perf_counter()
+    write_entries(results, doGlossary, dotex, dorst, doaastex, mode)
+    phases["write"] = time.perf_counter() - start
+
+    if profile:
+        profiles = [profile_tex_file(f, index.acronyms, index.matcher) for f in texfiles]
+        report = profile_report(profiles, phases, index.acronyms, skip)
+        if profile == "-":
+            write_profile(report)
+        else:
+            import json
+
+            with open(profile, "w") as fd:
+                json.dump(report, fd, indent=2)
+                fd.write("\n")
+    return len(results)
+
+
+def report_missing(missing: set[str]) -> None:
+    """Report terms found in the text that have no definition."""
+    if len(missing):
+        print(
+            "List of potential acronyms found in your text "
+            "that you may be missing. Please ignore if not relevant "
+            "(note that the list may not be complete)."
+        )
+        for m in sorted(missing):
+            print(f"Missing definition: {m}", file=sys.stderr)
+
+
+def build_entries(
+    matches: set[str],
+    index: GlossaryIndex,
+    doGlossary: bool,
+    dotex: bool,
+    doaastex: bool,
+    noadorn: bool,
+    converge: bool = False,
+) -> list[tuple[str, tuple[str, str]]]:
+    """Return the entries to write for the terms found in a document.
+
+    The arguments are as for `generate`.
+    """
+    # Attach definitions to matches
+    results = attach_definitions(matches, index)
+
+    if doGlossary and (dotex or doaastex):  # otherwise its just a table
+        if converge:
+            results, rounds = converge_glossary(matches, index, noadorn)
+            print(
+                f"Glossary converged to {len(results)} entries ({rounds} rescans of {glsFile} not needed)",
+                file=sys.stderr,
+            )
+        elif not noadorn:
+            results = update_gls_entries(results, index.lsst_definitions)
+    return results
+
+
+def write_entries(
+    results: list[tuple[str, tuple[str, str]]],
+    doGlossary: bool,
+    dotex: bool,
+    dorst: bool,
+    doaastex: bool,
+    mode: str,
+) -> str:
+    """Write the entries to the glossary or acronym table and return the
+    name of the file written.
+    """
+    suffix = mode
+    if mode == "aastex":
+        suffix = "tex"
+    acrFile = f"acronyms.{suffix}"
+    if doGlossary and (dotex or doaastex):  # otherwise its just a table
+        with open(glsFile, "w") as gfd:
+            write_latex_glossary(results, fd=gfd)
+        return glsFile
+    with open(acrFile, "w") as fd:
+        write_latex_table(results, dotex, dorst, doaastex, fd=fd)
+    return acrFile
+
+
+class Watcher:
+    """Regenerate the acronyms or glossary of a document as it is edited.
+
+    The glossary index and the terms found in each file are kept between
+    polls. When a tex file changes only that file is scanned again; when
+    the glossary, local definitions or skip files change the index is
+    reloaded and, if the defined terms differ, every file is rescanned. The
+    output is only rewritten when the entries change.
+
+    The arguments are as for `generate`.
+    """
+
+    def __init__(
+        self,
+        texfiles: Iterable[str],
+        doGlossary: bool,
+        utags: set[str],
+        dotex: bool,
+        dorst: bool,
+        doaastex: bool,
+        mode: str,
+        noadorn: bool,
+        writeallacronyms: bool = False,
+        cache_dir: str | None = None,
+    ) -> None:
+        self.texfiles = list(texfiles)
+        self.doGlossary = doGlossary
+        self.utags = utags
+        self.dotex = dotex
+        self.dorst = dorst
+        self.doaastex = doaastex
+        self.mode = mode
+        self.noadorn = noadorn
+        self.writeallacronyms = writeallacronyms
+        self.cache_dir = cache_dir
+        self.definition_files = [
+            *setup_paths(),
+            "skipacronyms.txt",
+            "myacronyms.txt",
+            "myglossarydefs.csv",
+        ]
+        self._stamps: dict[str, tuple[int, int] | None] = {}
+        self._index: GlossaryIndex | None = None
+        self._scans: dict[str, FileScan] = {}
+        self._missing: set[str] | None = None
+        self._results: list[tuple[str, tuple[str, str]]] | None = None
+
+    def _changed(self) -> dict[str, tuple[int, int] | None]:
+        """Return the stamps of the watched files that changed since the
+        last successful poll.
+        """
+        changed = {}
+        for filename in [*self.texfiles, *self.definition_files]:
+            stamp = _file_stamp(filename)
+            if filename not in self._stamps or stamp != self._stamps[filename]:
+                changed[filename] = stamp
+        return changed
+
+    def poll(self) -> bool:
+        """Rescan the changed files and rewrite the output if the entries
+        changed.
+
+        The files are only recorded as seen once the output is up to date,
+        so a change that fails is tried again at the next poll.
+
+        Returns
+        -------
+        written : `bool`
+            Whether the output file was written.
+        """
+        changed = self._changed()
+        if not changed:
+            return False
+        stamps = {**self._stamps, **changed}
+
+        if self._index is None or changed.keys() & set(self.definition_files):
+            index = load_glossary_index(self.utags, self.writeallacronyms, self.cache_dir)
+            if self._index is None or index.digest != self._index.digest:
+                self._scans.clear()
+            self._index = index
+
+        present = [f for f in self.texfiles if stamps[f] is not None]
+        for filename in set(self._scans) - set(present):
+            del self._scans[filename]
+        todo = [f for f in present if f in changed or f not in self._scans]
+        for scan in scan_tex_files(todo, self._index, cache_dir=self.cache_dir):
+            self._scans[scan.filename] = scan
+        print(f"Scanned {len(todo)} of {len(present)} files", file=sys.stderr)
+
+        matches: set[str] = set()
+        missing: set[str] = set()
+        for scan in self._scans.values():
+            matches.update(scan.matches)
+            missing.update(scan.missing)
+        if missing != self._missing:
+            report_missing(missing)
+            self._missing = missing
+
+        results = build_entries(
+            matches, self._index, self.doGlossary, self.dotex, self.doaastex, self.noadorn, converge=True
+        )
+        if results == self._results:
+            print("Entries unchanged", file=sys.stderr)
+            self._stamps = stamps
+            return False
+        written = write_entries(results, self.doGlossary, self.dotex, self.dorst, self.doaastex, self.mode)
+        print(f"Wrote {len(results)} entries to {written}", file=sys.stderr)
+        self._results = results
+        self._stamps = stamps
+        return True
+
+    def run(self, interval: float = 1.0) -> None:
+        """Poll for changes every ``interval`` seconds until interrupted.
+
+        An error while regenerating the output is reported and watching
+        carries on, so that it is tried again once the files are fixed.
+        """
+        print(f"Watching {len(self.texfiles)} files, press Ctrl-C to stop", file=sys.stderr)
+        try:
+            while True:
+                try:
+                    self.poll()
+                except Exception as e:
+                    print(f"Error: {e}", file=sys.stderr)
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            pass
+
+
+def update_gls_entries(
+    results: list[tuple[str, tuple[str, str]]], GLSlist: dict[str, set[tuple[str, str]]]
+) -> list[tuple[str, tuple[str, str]]]:
+    r"""Scan through the acronym and gls definitions and add \gls where
+    appropriate (similar to -u for the files)
+    """
+    new_result = []
+    rewriter = GlsRewriter(GLSlist)
+
+    for entry in results:
+        defn = entry[1][0]
+        type = entry[1][1]
+        acr = entry[0]
+        if type == "A":  # just see if we have a glossary match
+            if defn in GLSlist:  # ok we gls the entire thing
+                defn = r"\gls{" + defn + "}"
+            else:
+                defn = rewriter.sub_line(entry[1][0])
+        new_result.append((acr, (defn, type)))
+
+    return new_result
+
+
+def loadGLSlist() -> set[str]:
+    r"""Load all the glossary items from the generated glossary file.
+
+    We can then use those entries to go back and search for them in the
+    tex files to see of they have ``\gls``.
+    """
+    with open(glsFile) as fin:
+        # match gls entry but only take the first group
+        regex = re.compile(r"\\new.+\s*{(.+)}\s*{.+}\s*")
+        text = fin.read()
+        GLSlist = set(regex.findall(text))
+    return GLSlist
+
+
+def glsfn(s: re.Match) -> str:
+    r"""Put ``\gls{}`` -- used in the regexp substitution"""
+    return s.group(1) + "\\gls{" + s.group(2) + "}" + s.group(3)
+
+
+def make_regexmap(GLSlist: Iterable[str]) -> dict[str, re.Pattern]:
+    """Make a re map of regexps for substitution"""
+    regexmap = {}
+    for g in GLSlist:
+        regexmap[g] = re.compile(r"(^|[-,\s(](?<!={))(" + g + r")(\b)")
+    return regexmap
+
+
+def sub_line(line: str, regexmap: dict[str, re.Pattern], GLSlist: Iterable[str]) -> str:
+    r"""For given line put \gls around gls items not already adorned.
+    :return: modified line
+    """
+    nline = line
+    for g in GLSlist:
+        regx = regexmap[g]
+        res = regx.search(line)
+        if res is not None:  # ok now .. more checks
+            # check its not a word in a GLS item but not
+            # too greedy
+            # cite also has LDM sometimes - and that is not an acronym
+            glsed = re.search(r"cite|gls{.*" + g + "[a-z,A-Z, ]*}", line)
+            if not glsed:  # already glsed or contained in one
+                # .. find and add \gls -
+                nline = regx.sub(glsfn, line)
+    return nline
+
+
+class GlsRewriter:
+    r"""Put ``\gls`` around glossary terms in lines of tex.
+
+    This gives the same result as `sub_line` but rather than searching the
+    line with a regular expression per term, the terms that occur in the
+    line are found with one pass of an `AcronymMatcher` and only those are
+    checked further.
+
+    Parameters
+    ----------
+    GLSlist : `~collections.abc.Iterable` [`str`]
+        Glossary terms. As with `sub_line`, if several terms could be
+        adorned in a line only the last of them in this order is.
+    """
+
+    def __init__(self, GLSlist: Iterable[str]) -> None:
+        terms = list(GLSlist)
+        self.terms = set(terms)
+        self._order = {g: i for i, g in enumerate(terms)}
+        # Terms are used as regular expressions by make_regexmap. The few
+        # that are not plain text can not go in the matcher.
+        self._special = make_regexmap(g for g in terms if _REGEX_SPECIAL.search(g))
+        self._matcher = AcronymMatcher(g for g in terms if g not in self._special)
+        first = self._matcher.first_chars
+        # A term must start the line or follow one of these characters.
+        self._start = re.compile(r"(?:^|(?<=[-,\s(]))[" + re.escape(first) + "]") if first else None
+        self._regexmap: dict[str, re.Pattern] = {}
+        self._glsed: dict[str, re.Pattern] = {}
+
+    def candidates(self, line: str) -> set[str]:
+        """Return the terms that the regex of `make_regexmap` finds."""
+        found: set[str] = set()
+        if self._start is not None:
+            for start in self._start.finditer(line):
+                found.update(self._matcher.terms_at(line, start.start()))
+        found.update(g for g, regx in self._special.items() if regx.search(line))
+        return found
+
+    def sub_line(self, line: str) -> str:
+        r"""For given line put \gls around gls items not already adorned.
+
+        Parameters
+        ----------
+        line : `str`
+            Line of tex.
+
+        Returns
+        -------
+        line : `str`
+            The modified line.
+        """
+        # cite also has LDM sometimes - and that is not an acronym
+        if "cite" in line:
+            return line
+        # Later terms win so try them first.
+        for g in sorted(self.candidates(line), key=self._order.__getitem__, reverse=True):
+            # check its not a word in a GLS item but not
+            # too greedy. Plain terms can only match inside a gls{.
+            if "gls{" in line or g in self._special:
+                if g not in self._glsed:
+                    self._glsed[g] = re.compile(r"cite|gls{.*" + g + "[a-z,A-Z, ]*}")
+                if self._glsed[g].search(line):
+                    continue
+            if g not in self._regexmap:
+                self._regexmap.update(make_regexmap([g]))
+            return self._regexmap[g].sub(glsfn, line)
+        return line
+
+
+def _skip_update(line: str) -> bool:
+    """Return `True` for lines that should never get ``gls`` added."""
+    return (
+        line.startswith("%")
+        or "entry" in line
+        or "section" in line
+        or "title" in line
+        or "author" in line
+        or "begin" in line
+    )
+
+
+class FileUpdate(NamedTuple):
+    """Result of adding ``gls`` to one tex file."""
+
+    filename: str
+    changed: bool
+    diff: str
+    """Unified diff of the change, only filled in when asked for."""
+
+
+def updateFile(
+    inFile: str, GLSlist: set[str], rewriter: GlsRewriter | None = None, diff: bool = False
+) -> FileUpdate:
+    """Update the tex file by looking for acronyms
+    and glossary items GLSlist.
+
+    The new content is worked out in memory. Only if it differs is the file
+    written, via a temporary file renamed into place, with the original
+    kept as ``.tex.old``. Unchanged files are not touched so their
+    modification times do not trigger rebuilds. If ``diff`` is `True` no
+    file is written and the change is returned as a unified diff instead.
+    """
+    if rewriter is None:
+        rewriter = GlsRewriter(GLSlist)
+    with open(inFile) as fin:
+        old = fin.read()
+    # StringIO splits lines on newlines only, as iterating the file did.
+    new = "".join(line if _skip_update(line) else rewriter.sub_line(line) for line in io.StringIO(old))
+    if new == old:
+        return FileUpdate(inFile, False, "")
+    if diff:
+        import difflib
+
+        lines = difflib.unified_diff(
+            old.splitlines(keepends=True), new.splitlines(keepends=True), inFile, f"{inFile} (updated)"
+        )
+        return FileUpdate(inFile, True, "".join(lines))
+
+    import shutil
+    import tempfile
+
+    oldf = inFile.replace(".tex", ".tex.old")
+    directory = os.path.dirname(inFile) or "."
+    # Not .tex so that a file left by an interrupted run is not taken for
+    # a document by later globs.
+    tmpname = None
+    try:
+        with tempfile.NamedTemporaryFile("w", dir=directory, suffix=".tmp", delete=False) as fout:
+            tmpname = fout.name
+            fout.write(new)
+        shutil.copymode(inFile, tmpname)
+        shutil.copy2(inFile, oldf)
+        os.replace(tmpname, inFile)
+    finally:
+        if tmpname is not None and os.path.exists(tmpname):
+            os.remove(tmpname)
+    return FileUpdate(inFile, True, "")
+
+
+# Rewriter used by _update_in_worker, set once per worker process.
+_update_rewriter: GlsRewriter | None = None
+
+
+def _init_update(rewriter: GlsRewriter) -> None:
+    """Set the rewriter to use in this process."""
+    global _update_rewriter
+    _update_rewriter = rewriter
+
+
+def _update_in_worker(inFile: str, diff: bool) -> FileUpdate:
+    """Update a tex file with the rewriter of this process."""
+    assert _update_rewriter is not None
+    return updateFile(inFile, _update_rewriter.terms, _update_rewriter, diff)
+
+
+def update(texfiles: list[str], jobs: int = 1, diff: bool = False) -> list[FileUpdate]:
+    """Update the passed tex files by looking for acronyms and glossary items
+    loaded from aglossary.tex.
+
+    The files are independent so with ``jobs`` greater than one they are
+    processed in parallel. With ``diff`` the changes are printed as a
+    unified diff and no files are written.
+    """
+    if not texfiles:
+        raise RuntimeError("No files supplied.")
+
+    if not diff:
+        print("Updating texfiles the original of any changed file will be .old ")
+        print(
+            """If glossary items contain \\gls refs you may need to run this
+              again to catch the entries in aglossary.tex """
+        )
+    GLSlist = loadGLSlist()  # Grab all the found glossary and acronyms
+    rewriter = GlsRewriter(GLSlist)
+    # in each file look for each glossary item and replace wit \gls{item}
+    if jobs <= 1 or len(texfiles) <= 1:
+        updates = [updateFile(f, GLSlist, rewriter, diff) for f in texfiles]
+    else:
+        import concurrent.futures
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs, initializer=_init_update, initargs=(rewriter,)
+        ) as pool:
+            updates = list(pool.map(_update_in_worker, texfiles, [diff] * len(texfiles)))
+
+    for result in updates:
+        if result.diff:
+            print(result.diff, end="")
+    changed = sum(result.changed for result in updates)
+    print(f"{changed} of {len(updates)} files {'would change' if diff else 'updated'}", file=sys.stderr)
+    return updates
+
+
+class BatchDocument(NamedTuple):
+    """A document to process with `run_batch`."""
+
+    dir: str
+    """Directory holding the document, its local definition and skip files
+    and where the output is written."""
+
+    files: list[str]
+    """TeX files or glob patterns relative to ``dir``."""
+
+    glossary: bool = False
+    """Write :file:`aglossary.tex` rather than a table, as for ``-g``."""
+
+    mode: str = "tex"
+    """Output mode for the table, one of `OUTPUT_MODES`."""
+
+    tags: list[str] | str = ""
+    """Tags used to select between definitions."""
+
+    noadorn: bool = False
+    r"""Do not add ``\gls`` to the definitions."""
+
+    writeallacronyms: bool = False
+    """Do not remove the skipped terms."""
+
+    def texfiles(self) -> list[str]:
+        """Return the TeX files, relative to ``dir``.
+
+        Generated acronym and glossary files are left out of the glob
+        matches.
+        """
+        import glob
+
+        generated = {glsFile} | {f"acronyms.{mode}" for mode in OUTPUT_MODES}
+        texfiles: list[str] = []
+        for pattern in self.files:
+            if glob.has_magic(pattern):
+                matched = sorted(glob.glob(pattern, root_dir=self.dir))
+                texfiles.extend(f for f in matched if os.path.basename(f) not in generated)
+            else:
+                texfiles.append(pattern)
+        return texfiles
+
+    def utags(self) -> set[str]:
+        """Return the tags as a set."""
+        if isinstance(self.tags, str):
+            return {t for t in re.split(r"[\s,]", self.tags) if t}
+        return set(self.tags)
+
+
+def read_manifest(filename: str) -> list[BatchDocument]:
+    """Read a YAML manifest of documents to process in one batch.
+
+    The manifest has a ``documents`` list with an entry for each document,
+    giving its directory and optionally the other fields of
+    `BatchDocument`. Values in an optional ``defaults`` mapping apply to
+    every document. Directories are relative to the manifest.
+
+    Parameters
+    ----------
+    filename : `str`
+        Path to the manifest.
+
+    Returns
+    -------
+    documents : `list` [`BatchDocument`]
+        The documents, in the order given.
+    """
+    from yamltools import load_yaml
+
+    with open(filename) as fd:
+        manifest = load_yaml(fd)
+    if not isinstance(manifest, dict) or not isinstance(manifest.get("documents"), list):
+        raise ValueError(f"{filename} has no list of documents")
+    defaults = manifest.get("defaults") or {}
+    topdir = os.path.dirname(os.path.abspath(filename))
+    documents = []
+    for n, entry in enumerate(manifest["documents"]):
+        if isinstance(entry, str):
+            entry = {"dir": entry}
+        options = {"files": ["*.tex"], **defaults, **entry}
+        if "dir" not in options:
+            raise ValueError(f"Document {n} in {filename} has no dir")
+        if isinstance(options["files"], str):
+            options["files"] = [options["files"]]
+        try:
+            document = BatchDocument(**options)
+        except TypeError as e:
+            raise ValueError(f"Document {n} in {filename}: {e}") from None
+        if document.mode not in OUTPUT_MODES:
+            raise ValueError(f"Document {n} in {filename} has unknown mode {document.mode}")
+        documents.append(document._replace(dir=os.path.join(topdir, document.dir)))
+    return documents
+
+
+def run_batch(documents: list[BatchDocument], cache_dir: str | None = None, jobs: int = 1) -> int:
+    """Generate the acronyms or glossary of many documents in one process.
+
+    The glossary definitions are read once and documents with the same tags
+    and local files share the compiled matcher. Each document is processed
+    as if the script was run in its directory, so the output is written
+    there.
+
+    Parameters
+    ----------
+    documents : `list` [`BatchDocument`]
+        The documents to process.
+    cache_dir : `str`, optional
+        Directory holding the compiled glossary data, see `generate`.
+    jobs : `int`, optional
+        Number of processes to scan the files of each document with.
+
+    Returns
+    -------
+    failed : `int`
+        The number of documents that could not be processed.
+    """
+    global doGlossary
+    failed = 0
+    start = time.perf_counter()
+    cwd = os.getcwd()
+    for document in documents:
+        print(f"== {document.dir}", file=sys.stderr)
+        doc_start = time.perf_counter()
+        doGlossary = document.glossary
+        try:
+            os.chdir(document.dir)
+            count = generate(
+                set(document.texfiles()),
+                document.glossary,
+                document.utags(),
+                document.mode == "tex",
+                document.mode == "rst",
+                document.mode == "aastex",
+                document.mode,
+                document.noadorn,
+                document.writeallacronyms,
+                cache_dir,
+                converge=True,
+                jobs=jobs,
+            )
+        except Exception as e:
+            failed += 1
+            print(f"Failed to process {document.dir}: {e}", file=sys.stderr)
+            continue
+        finally:
+            os.chdir(cwd)
+        print(f"Wrote {count} entries in {time.perf_counter() - doc_start:.2f}s", file=sys.stderr)
+    print(
+        f"Processed {len(documents) - failed} of {len(documents)} documents "
+        f"in {time.perf_counter() - start:.2f}s",
+        file=sys.stderr,
+    )
+    return failed
+
+
+def load_translation(
+    locale: str, filename: str, errors: list[str] | None = None
+) -> dict[str, str | dict[str, str]]:
+    """Load a translation file for given locale
+    simplistic for now - append local to file name
+    load in a dict assume acronynm, definition, [tag].
+    We need to use the tag for overloaded acronyms.
+    This will also check for repeat acronym without tag.
+    If a list of ``errors`` is given problems are added to it and the
+    remaining rows still read, rather than raising on the first.
+    """
+    import csv
+
+    transfile = filename.replace(".csv", f"_{locale}.csv")
+    translation: dict[str, str | dict[str, str]] = {}
+    with open(transfile, encoding="utf-8") as fd:
+        reader = csv.reader(fd, delimiter=",", quotechar='"')
+        _ = next(reader)  # This is the header
+        for lc, row in enumerate(reader):
+            try:
+                if len(row) > 3:  # no more than 3 cols
+                    raise ValueError("Too many columns")
+                if len(row) < 3:  # exactly 3 cols
+                    raise ValueError("Too few columns")
+                ind = 0
+                acr = escape_for_tex(row[ind])
+                defn = escape_for_tex(row[ind + 1])
+                tag = row[ind + 2]
+                # If there is a tag its overloaded - so make a map of
+                if len(tag) > 5:
+                    raise ValueError("Tag too long ")
+                if len(tag) > 0:
+                    trans: dict[str, str] = {}
+                    if acr in translation:
+                        existing = translation[acr]
+                        if isinstance(existing, str):
+                            if existing != defn:
+                                raise ValueError(
+                                    f"Duplicate translation for tag {tag} for {acr} in "
+                                    f"{transfile} line {lc}: {defn} != {existing}"
+                                )
+                        else:
+                            trans = existing
+                    if tag in trans:
+                        raise ValueError(f"Duplicate tag {tag} for {acr} in {transfile} line {lc}")
+                    trans[tag] = defn
+                    translation[acr] = trans
+                else:
+                    if acr in translation:
+                        raise ValueError(
+                            f"Duplicate translation for {acr} in {transfile} line {lc} without tag"
+                        )
+                    translation[acr] = defn
+            except ValueError as ex:
+                if errors is None:
+                    print(f"Error reading {transfile} on line {lc} - {row}")
+                    raise
+                errors.append(f"{transfile} line {lc}: {ex} - {row}")
+    return translation
+
+
+def join_translations(
+    store: GlossaryStore, translation: dict[str, str | dict[str, str]], errors: list[str]
+) -> list[str | None]:
+    """Return the translation of each row of the glossary.
+
+    Terms with more than one definition are translated by tag. Rows whose
+    tags have no translation are added to ``errors``.
+
+    Parameters
+    ----------
+    store : `GlossaryStore`
+        The glossary.
+    translation : `dict`
+        Translations as returned by `load_translation`.
+    errors : `list` [`str`]
+        List to add errors to.
+
+    Returns
+    -------
+    translations : `list` [`str` or `None`]
+        The translation of each row, `None` if there is none.
+    """
+    column: list[str | None] = []
+    for acr, tags in zip(store.terms, store.tags, strict=True):
+        trans = translation.get(escape_for_tex(acr))
+        # it may be a map of tags
+        if isinstance(trans, dict):
+            # The TAG is the key if it's set up properly
+            if tags not in trans:
+                errors.append(
+                    f"Error: {tags} not in {trans.keys()}  for"
+                    f" {escape_for_tex(acr)} - translation missing or the tags do not match"
+                )
+            trans = trans.get(tags)
+        column.append(trans)
+    return column
+
+
+def discover_locales(filename: str) -> list[str]:
+    """Return the locales with a translation of a glossary file.
+
+    Translations are in files named after the glossary with ``_<locale>``
+    added, such as :file:`glossarydefs_es.csv`.
+    """
+    import glob
+
+    stem, ext = os.path.splitext(filename)
+    locales = []
+    for path in glob.glob(f"{glob.escape(stem)}_*{ext}"):
+        locale = path[len(stem) + 1 : -len(ext)]
+        if LOCALE_RE.fullmatch(locale):
+            locales.append(locale)
+    return sorted(locales)
+
+
+def load_translations(
+    filename: str, locales: Iterable[str], errors: list[str], jobs: int | None = None
+) -> dict[str, dict[str, str | dict[str, str]]]:
+    """Load the translations of a glossary for several locales at once.
+
+    Each file is read by `load_translation` in its own thread. Problems are
+    added to ``errors``.
+    """
+    locales = list(locales)
+    found: list[list[str]] = [[] for _ in locales]
+    if len(locales) == 1:
+        # Not worth the import and start of a thread pool.
+        translations = {locales[0]: load_translation(locales[0], filename, found[0])}
+    else:
+        import concurrent.futures
+
+        with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as pool:
+            loaded = pool.map(load_translation, locales, [filename] * len(locales), found)
+            translations = dict(zip(locales, loaded, strict=True))
+    # Keep the errors in the order of the locales.
+    for locale_errors in found:
+        errors.extend(locale_errors)
+    return translations
+
+
+def _join_glossary(
+    filename: str, store: GlossaryStore, locales: list[str], jobs: int | None = None
+) -> tuple[list[list[str | None]], dict[str, dict[str, str | dict[str, str]]]]:
+    """Check a glossary and its translations and join them.
+
+    Returns the translation column for each locale and the translations
+    as loaded. All the problems found are printed and a `ValueError` raised
+    if there are any. The store should be read with ``strict=False`` so
+    that every row with too few columns is found.
+    """
+    errors = []
+    for row, width in enumerate(store.widths):
+        # now strict no blanks and 6 cols
+        if width != store.COLUMNS:
+            problem = "Too few columns." if width < store.COLUMNS else "Too many columns."
+            errors.append(f"Error reading {filename} on line {store.lines[row]} - {problem}")
+    translations = load_translations(filename, locales, errors, jobs)
+    columns = [join_translations(store, translations[locale], errors) for locale in locales]
+    if errors:
+        for error in errors:
+            print(error)
+        raise ValueError(f"Found {len(errors)} problems with {filename} and its translations")
+    return columns, translations
+
+
+def render_glossary(
+    store: GlossaryStore, locales: list[str], columns: list[list[str | None]]
+) -> tuple[list[str], list[str], list[str], list[str]]:
+    """Render the full glossary with translations.
+
+    Parameters
+    ----------
+    store : `GlossaryStore`
+        The glossary.
+    locales : `list` [`str`]
+        Locales of the translations.
+    columns : `list` [`list` [`str` or `None`]]
+        Translation of each row for each locale, from `join_translations`.
+
+    Returns
+    -------
+    table : `list` [`str`]
+        Lines of the LaTeX longtable.
+    html : `list` [`str`]
+        Lines of the CSV for the glossary web page.
+    full : `list` [`str`]
+        Lines of :file:`fullgls.tex` using every entry.
+    missing : `list` [`str`]
+        Messages for the missing translations.
+    """
+    sep = " & "
+    end = r" \\"
+    table = [
+        r"""\addtocounter{table}{-1}
+            \begin{longtable}{p{0.15\textwidth}p{0.7\textwidth}p{0.15\textwidth}}\hline
+            \textbf{Entry} & \textbf{Description} & \textbf{Tags}  \\\hline
+            """
+    ]
+    html = []
+    full = []
+    missing = []
+    for row, term in enumerate(store.terms):
+        acr = escape_for_tex(term)
+        tags = store.tags[row]
+        # Put every glossary entry in a file, unless it has an
+        # odd character.
+        # AI&T seems ok as acronym breaks glossary.
+        if not specialCharsRe.search(acr):
+            full.append(f"\\gls{{{acr}}}")
+        defn = escape_for_tex(store.definitions[row])
+        html.append(",".join([f'"{acr}"', f'"{defn}"', tags]))
+        entry = defn
+        for locale, column in zip(locales, columns, strict=True):
+            trans = column[row]
+            if trans:
+                html.append(",".join([f'"{acr}"', f'"{trans}"', tags]))
+                entry += "\n\n" + escape_for_tex(trans)
+            else:
+                where = f" [{locale}]" if len(locales) > 1 else ""
+                missing.append(f"Missing translation for: {acr}:{defn}{where}")
+        table.append(sep.join([acr, entry, tags]) + end)
+    table.append(r"\end{longtable}")
+    return table, html, full, missing
+
+
+def _write_lines(filename: str, lines: list[str]) -> None:
+    """Write lines to a file in one go."""
+    with open(filename, "w") as fd:
+        fd.write("".join(f"{line}\n" for line in lines))
+
+
+def dump_gls(filename: str, out_file: str, locales: Iterable[str] = ("es",)) -> int:
+    """Read the definition file and just output a latex table,
+    include the translations where available and also do that for a csv to
+    be used on the glossary page.
+
+    Every row and translation is checked before anything is written and
+    all the problems found are reported together.
+
+    Parameters
+    ----------
+    filename : `str`
+        Path to the glossary definitions.
+    out_file : `str`
+        Path to write the table to.
+    locales : `~collections.abc.Iterable` [`str`], optional
+        Locales of the translations to include, each read from the file
+        named after ``filename`` with ``_<locale>`` added.
+
+    Returns
+    -------
+    count : `int`
+        Number of rows read, including the header.
+    """
+    locales = list(locales)
+    store = GlossaryStore.from_csv(filename, strict=False)
+    columns, _ = _join_glossary(filename, store, locales)
+    table, html, full, missing = render_glossary(store, locales, columns)
+    if missing:
+        print("\n".join(missing))
+    _write_lines(out_file, table)
+    _write_lines("htmlglossary.csv", html)
+    _write_lines("fullgls.tex", full)
+    return store.lines[-1] if len(store) else 1
+
+
+class Coverage(NamedTuple):
+    """How much of the glossary is translated for a locale."""
+
+    locale: str
+    translated: int
+    """Number of entries with a translation."""
+    total: int
+    """Number of entries in the glossary."""
+    unused: int
+    """Number of translated terms that are not in the glossary."""
+
+    @property
+    def percent(self) -> float:
+        """Percentage of entries translated."""
+        return 100.0 * self.translated / self.total if self.total else 0.0
+
+
+def export_glossary(
+    filename: str, outdir: str, locales: Iterable[str] | None = None, jobs: int | None = None
+) -> list[Coverage]:
+    """Write the glossary table and web page CSV for every locale.
+
+    The glossary is read once and the translations are loaded in parallel.
+    For each locale :file:`glossary_<locale>.tex` and
+    :file:`htmlglossary_<locale>.csv` are written, containing the English
+    definitions and their translation, along with :file:`fullgls.tex`.
+    Nothing is written if any translation has problems.
+
+    Parameters
+    ----------
+    filename : `str`
+        Path to the glossary definitions.
+    outdir : `str`
+        Directory to write to. Created if needed.
+    locales : `~collections.abc.Iterable` [`str`], optional
+        Locales to export, by default all those found by
+        `discover_locales`.
+    jobs : `int`, optional
+        Number of translations to load at once.
+
+    Returns
+    -------
+    coverage : `list` [`Coverage`]
+        How much of the glossary is translated for each locale.
+    """
+    locales = discover_locales(filename) if locales is None else list(locales)
+    store = GlossaryStore.from_csv(filename, strict=False)
+    columns, translations = _join_glossary(filename, store, locales, jobs)
+
+    os.makedirs(outdir, exist_ok=True)
+    terms = {escape_for_tex(term) for term in store.terms}
+    coverage = []
+    full: list[str] = []
+    for locale, column in zip(locales, columns, strict=True):
+        table, html, full, _ = render_glossary(store, [locale], [column])
+        _write_lines(os.path.join(outdir, f"glossary_{locale}.tex"), table)
+        _write_lines(os.path.join(outdir, f"htmlglossary_{locale}.csv"), html)
+        coverage.append(
+            Coverage(
+                locale,
+                sum(1 for trans in column if trans),
+                len(column),
+                len(set(translations[locale]) - terms),
+            )
+        )
+    if not locales:
+        _, _, full, _ = render_glossary(store, [], [])
+    _write_lines(os.path.join(outdir, "fullgls.tex"), full)
+    return coverage
+
+
+def normalize_text(text: str) -> str:
+    """Lower case text and remove accents so searches match regardless."""
+    import unicodedata
+
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def search_tokens(text: str) -> set[str]:
+    """Return the normalised words in some text."""
+    return set(SEARCH_TOKEN_RE.findall(normalize_text(text)))
+
+
+def _shard(text: str) -> str:
+    """Return the shard of the search index for a normalised string:
+    its initial letter, ``0`` for a digit or ``_`` for anything else.
+    """
+    initial = text[:1]
+    if "a" <= initial <= "z":
+        return initial
+    return "0" if initial.isdigit() else "_"
+
+
+def export_search_index(filename: str, outdir: str, locales: Iterable[str] | None = None) -> dict[str, int]:
+    """Write a JSON search index of the glossary for the glossary web page.
+
+    The index is split by initial letter so a page only needs to fetch the
+    parts for what is typed:
+
+    - :file:`index/<letter>.json` maps each normalised word in the terms,
+      definitions and alternative terms that starts with the letter to the
+      ids of the entries containing it.
+    - :file:`entries/<letter>.json` lists the entries whose term starts with
+      the letter. An id is the letter followed by the position in this list.
+    - :file:`manifest.json` gives the fields of an entry, the locales and
+      the size of each part.
+
+    Words are lower case with accents removed, see `normalize_text`.
+
+    Parameters
+    ----------
+    filename : `str`
+        Path to the glossary definitions.
+    outdir : `str`
+        Directory to write to. Created if needed.
+    locales : `~collections.abc.Iterable` [`str`], optional
+        Locales whose translations are added to the entries, by default all
+        those found by `discover_locales`.
+
+    Returns
+    -------
+    stats : `dict` [`str`, `int`]
+        The number of entries, distinct words and shards and the bytes
+        written.
+    """
+    import json
+
+    locales = discover_locales(filename) if locales is None else list(locales)
+    store = GlossaryStore.from_csv(filename, strict=False)
+    columns, _ = _join_glossary(filename, store, locales)
+
+    entries: dict[str, list[list[str | list[str] | None]]] = {}
+    postings: dict[str, dict[str, list[str]]] = {}
+    for row, term in enumerate(store.terms):
+        if not term:
+            continue
+        shard = _shard(normalize_text(term))
+        entry_shard = entries.setdefault(shard, [])
+        entry_id = f"{shard}{len(entry_shard)}"
+        entry_shard.append(
+            [
+                term,
+                store.definitions[row],
+                store.tags[row],
+                store.types[row],
+                list(store.alternatives[row]),
+                *(column[row] for column in columns),
+            ]
+        )
+        words = search_tokens(term) | search_tokens(store.definitions[row])
+        for alt in store.alternatives[row]:
+            words |= search_tokens(alt)
+        for word in words:
+            postings.setdefault(_shard(word), {}).setdefault(word, []).append(entry_id)
+
+    written = 0
+
+    def write(name: str, value: object) -> int:
+        nonlocal written
+        path = os.path.join(outdir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps(value, ensure_ascii=False, separators=(",", ":"), sort_keys=True).encode()
+        with open(path, "wb") as fd:
+            fd.write(data)
+        written += len(data)
+        return len(data)
+
+    shards: dict[str, dict[str, int]] = {}
+    for shard in sorted(entries.keys() | postings.keys()):
+        shards[shard] = {"entries": len(entries.get(shard, [])), "words": len(postings.get(shard, {}))}
+        if shard in entries:
+            shards[shard]["entries_bytes"] = write(f"entries/{shard}.json", entries[shard])
+        if shard in postings:
+            shards[shard]["index_bytes"] = write(f"index/{shard}.json", postings[shard])
+    write(
+        "manifest.json",
+        {
+            "version": 1,
+            "fields": ["term", "definition", "tags", "type", "alternatives", *locales],
+            "locales": locales,
+            "shards": shards,
+        },
+    )
+    return {
+        "entries": sum(len(e) for e in entries.values()),
+        "words": sum(len(p) for p in postings.values()),
+        "shards": len(shards),
+        "bytes": written,
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run generateAcronyms.py with the given command line arguments and
+    return the exit status.
+    """
+    global doGlossary
+    description = __doc__
+    formatter = argparse.RawDescriptionHelpFormatter
+    parser = argparse.ArgumentParser(description=description, formatter_class=formatter)
+
+    parser.add_argument("files", metavar="FN", nargs="*", help="FILE to process")
+    parser.add_argument(
+        "-g",
+        "--glossary",
+        action="store_true",
+        help=""" Generate aglossary.tex a glossary file for
+                                 acronyms and glossary entries.""",
+    )
+    parser.add_argument(
+        "-u",
+        "--update",
+        action="store_true",
+        help="""Update files to put \\gls on acronyms and
+                                glossary entries .""",
+    )
+    parser.add_argument(
+        "-m",
+        "--mode",
+        default="tex",
+        choices=OUTPUT_MODES,
+        help="""Output mode for table.
+                                verbose' displays all the information...""",
+    )
+    parser.add_argument(
+        "-t",
+        "--tags",
+        help="""Space or comma-separated list of tags between quotes
+                                to use in selecting definitions.""",
+    )
+    parser.add_argument(
+        "-c",
+        "--check",
+        action="store_true",
+        help="""Check the glossary file loads correctly
+                                 to run on push. Pass dummy filename""",
+    )
+    parser.add_argument(
+        "-n",
+        "--noadorn",
+        action="store_true",
+        help=r"""Do not adorn the glossary/acronym entries
+                                 with \gls (only done for glossary mode)""",
+    )
+    parser.add_argument(
+        "-d",
+        "--dump",
+        action="store_true",
+        help=""" Generate glossary dump file using passed
+                                 filename containing  all entries.""",
+    )
+    parser.add_argument(
+        "-s",
+        "--writeallacronyms",
+        action="store_true",
+        help="""Do not load skip acronyms file""",
+    )
+    parser.add_argument(
+        "--diff",
+        action="store_true",
+        help="""With -u show the changes as a unified diff
+                                 rather than writing the files.""",
+    )
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="""Number of processes to use when scanning
+                                 or updating files.""",
+    )
+    parser.add_argument(
+        "--timing",
+        action="store_true",
+        help="""Report the time taken to scan each file.""",
+    )
+    parser.add_argument(
+        "--follow-includes",
+        action="store_true",
+        help="""Treat the files as root documents and also scan
+                                 every file they \\input, \\include or
+                                 \\subfile, each once.""",
+    )
+    parser.add_argument(
+        "--profile",
+        metavar="FILE",
+        help="""Report where each term was found and the time
+                                 taken by each phase and pass, as JSON to
+                                 FILE or as text to stderr if FILE is -.""",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="""Do not use or update the cache of compiled
+                                 glossary definitions and scanned files.""",
+    )
+    parser.add_argument(
+        "--locale",
+        action="append",
+        help="""Locale of the translations to include with -c
+                                 and -d, may be given more than once.
+                                 Default is es.""",
+    )
+    parser.add_argument(
+        "--export",
+        metavar="DIR",
+        help="""Write the glossary table and web page CSV for
+                                 each translation of the glossary to DIR.
+                                 All translations are used unless --locale
+                                 is given.""",
+    )
+    parser.add_argument(
+        "--search-index",
+        metavar="DIR",
+        help="""Write a JSON search index of the glossary, split
+                                 by initial letter, to DIR for the glossary
+                                 web page.""",
+    )
+    parser.add_argument(
+        "--batch",
+        metavar="MANIFEST",
+        help="""Process each document listed in this YAML
+                                 manifest, in its own directory, sharing
+                                 the loaded glossary.""",
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="""Keep running and regenerate the output whenever
+                                 the files or definitions change.""",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="""Seconds between checks for changes with
+                                 --watch.""",
+    )
+    args = parser.parse_args(argv)
+    cache_dir = None if args.no_cache else default_cache_dir()
+    if args.watch and (args.update or args.batch or args.check or args.dump):
+        parser.error("--watch can not be combined with -u, -c, -d or --batch")
+    if args.profile and (args.watch or args.batch):
+        parser.error("--profile can not be combined with --watch or --batch")
+    if args.diff and not args.update:
+        parser.error("--diff requires -u")
+    if args.export:
+        for cov in export_glossary(setup_paths()[0], args.export, args.locale):
+            print(
+                f"{cov.locale}: {cov.translated} of {cov.total} entries translated ({cov.percent:.1f}%)"
+                + (f", {cov.unused} translations of unknown terms" if cov.unused else "")
+            )
+        return 0
+    if args.search_index:
+        stats = export_search_index(setup_paths()[0], args.search_index, args.locale)
+        print(
+            f"Indexed {stats['entries']} entries, {stats['words']} words in {stats['shards']} shards"
+            f" ({stats['bytes']} bytes) to {args.search_index}"
+        )
+        return 0
+    if args.batch:
+        return 1 if run_batch(read_manifest(args.batch), cache_dir, args.jobs) else 0
+    if not args.files:
+        parser.error("the following arguments are required: FN")
+    doGlossary = args.glossary
+    doCheck = args.check
+    writeallacronyms = args.writeallacronyms
+
+    texfiles = args.files
+    if args.follow_includes:
+        texfiles = expand_includes(texfiles, cache_dir)
+    tagstr = args.tags
+    utags = set()
+    dotex = args.mode == "tex"
+    dorst = args.mode == "rst"
+    doaastex = args.mode == "aastex"
+    noadorn = args.noadorn
+
+    if args.dump:
+        # just format the full list in a table
+        dump_gls(setup_paths()[0], texfiles[0], args.locale or ["es"])
+        print("Dumped glossary defs to", texfiles[0])
+        return 0
+
+    if tagstr:
+        utags.update(re.split(r"[\s,]", tagstr))
+
+    if doCheck:
+        # For now load the glossary .. see if we get an excpetion
+        # return appropriate exit code to make ci pass or fail
+        # also dump all entries to file so we can make a pdf outside
+        status = 0
+        try:
+            dump_gls(setup_paths()[0], texfiles[0], args.locale or ["es"])
+        except BaseException as ex:
+            status = 1
+            print(f"Exception:{ex}")
+            import traceback
+
+            traceback.print_exc()
+        return status
+
+    if args.watch:
+        watcher = Watcher(
+            texfiles,
+            doGlossary,
+            utags,
+            dotex,
+            dorst,
+            doaastex,
+            args.mode,
+            noadorn,
+            writeallacronyms,
+            cache_dir,
+        )
+        watcher.run(args.interval)
+        return 0
+
+    if doGlossary or (not args.update):
+        # Allow update to really just update/rewrite files not regenerate
+        # glossary
+        generate(
+            texfiles,
+            doGlossary,
+            utags,
+            dotex,
+            dorst,
+            doaastex,
+            args.mode,
+            noadorn,
+            writeallacronyms,
+            cache_dir,
+            converge=True,
+            jobs=args.jobs,
+            timing=args.timing,
+            profile=args.profile,
+        )
+    # Go through files on second pass  or on demand and \gls  or not (-u)
+    if args.update:
+        update(texfiles, args.jobs, args.diff)
+    return 0
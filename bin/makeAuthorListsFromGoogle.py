@@ -30,7 +30,6 @@ import pickle
 import re
 from typing import Any
 
-import yaml
 from authordb import Address, Affiliation, AuthorDbAuthor, dump_authordb, load_authordb, strip_utf
 from google.auth.transport.requests import Request
 from google_auth_oauthlib.flow import InstalledAppFlow
@@ -38,6 +37,7 @@ from googleapiclient.discovery import build
 from oauth2client.client import Credentials
 from pydantic import BaseModel, Field
 from pylatexenc.latexencode import unicode_to_latex
+from yamltools import dump_yaml, load_yaml
 
 # If modifying these scopes, delete your previously saved credentials
 # at ~/.credentials/sheets.googleapis.com-python-quickstart.json
@@ -50,7 +50,7 @@ script_name = os.path.basename(__file__)
 # Load column index map from YAML if available, else use defaults
 try:
     with open("column_map.yaml") as f:
-        column_map = yaml.safe_load(f) or {}
+        column_map = load_yaml(f) or {}
 except FileNotFoundError:
     column_map = {}
 except Exception as e:
@@ -132,27 +132,27 @@ def write_yaml(name: str, values: Any) -> None:
     """Write given dat to  the file name  YAML"""
     with open(name, "w") as file:
         file.write(f"# this file` was generated by {script_name} do not edit\n")
-        yaml.dump(values, file)
+        dump_yaml(values, file)
 
 
 def write_model(name: str, authors: dict[str, AuthorDbAuthor]) -> None:
     """Write given data to  the file name  YAML"""
     adb = AuthorYaml(authors=authors)
     with open(name, "w") as file:
-        yaml.dump(adb.model_dump(), file)
+        dump_yaml(adb.model_dump(), file)
 
 
 def write_affil(name: str, affils: dict[str, Affiliation]) -> None:
     """Write given data to  the file name  YAML"""
     adb = AffilYaml(affiliations=affils)
     with open(name, "w") as file:
-        yaml.dump(adb.model_dump(), file)
+        dump_yaml(adb.model_dump(), file)
 
 
 def load_model(filename: str) -> dict[str, AuthorDbAuthor]:
     """Read authors  data from the YAML file"""
     with open(filename) as file:
-        yaml_data = yaml.safe_load(file)
+        yaml_data = load_yaml(file)
         print("Parsing into AuthorYaml object...\n")
         adb = AuthorYaml.model_validate(yaml_data)
     return adb.authors
@@ -710,7 +710,7 @@ def merge_affiliations(affil_file: str) -> None:
     """Merge affiliations from the given YAML file into the authordb."""
     print(f"Merging affiliations using file: {affil_file}")
     with open(affil_file) as file:
-        yaml_data = yaml.safe_load(file)
+        yaml_data = load_yaml(file)
         adb = load_authordb()
         affil_yaml = AffilYaml.model_validate(yaml_data)
         print(f"Have {len(adb.affiliations)} affiliations")
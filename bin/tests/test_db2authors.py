@@ -0,0 +1,101 @@
+import contextlib
+import io
+import unittest
+
+import db2authors
+from db2authors import (
+    AAP,
+    ASCOM,
+    AASTeX7,
+    Arxiv,
+    AuthorBlockGenerator,
+    AuthorFactory,
+    LsstDoc,
+    ProcSpie,
+    WebOfC,
+    latex2text,
+    latex2text_many,
+)
+
+
+class TestLatex2Text(unittest.TestCase):
+    """Test conversion of LaTeX to plain text."""
+
+    def setUp(self) -> None:
+        db2authors._plain_text.clear()
+
+    def test_convert(self) -> None:
+        self.assertEqual(latex2text(r"Jos\'e~Garc\'{\i}a"), "José\xa0García")
+        # The result is remembered.
+        self.assertIn(r"Jos\'e~Garc\'{\i}a", db2authors._plain_text)
+
+    def test_many(self) -> None:
+        latex = [r"M\"uller", "Smith", r"M\"uller", r"\AA{}ngstr\"om"]
+        expected = ["Müller", "Smith", "Müller", "Ångström"]
+        self.assertEqual(latex2text_many(latex), expected)
+        db2authors._plain_text.clear()
+        self.assertEqual(latex2text_many(latex, jobs=2), expected)
+        self.assertEqual(len(db2authors._plain_text), 3)
+
+
+class TestAuthorFactory(unittest.TestCase):
+    """Test resolving authors from the database."""
+
+    def setUp(self) -> None:
+        self.factory = AuthorFactory(
+            affiliations={
+                "Rubin": {"institute": "Rubin Observatory", "email": "lsst.org"},
+                "UW": {"institute": "University of Washington", "address": {"example_expanded": "Seattle"}},
+            },
+            authors={
+                "smithj": {
+                    "given_name": "J.",
+                    "family_name": "Smith",
+                    "affil": ["Rubin", "UW"],
+                    "altaffil": [],
+                },
+                "jonesa": {"given_name": "A.", "family_name": "Jones", "affil": ["UW"], "altaffil": []},
+                "leek": {"given_name": "K.", "family_name": "Lee", "affil": ["MIT", "UW"], "altaffil": []},
+            },
+        )
+
+    def test_shared_affiliations(self) -> None:
+        smith = self.factory.get_author("smithj")
+        with contextlib.redirect_stderr(io.StringIO()):
+            jones = self.factory.get_author("jonesa")
+        self.assertIs(smith.affiliations[1], jones.affiliations[0])
+        self.assertIs(self.factory.get_affiliation("UW"), jones.affiliations[0])
+        self.assertEqual(self.factory.get_affiliation_id(jones.affiliations[0]), "UW")
+        self.assertEqual(smith.email, "unknown@lsst.org")
+        with self.assertRaises(RuntimeError):
+            self.factory.get_affiliation("MIT")
+
+    def test_get_authors(self) -> None:
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            authors = self.factory.get_authors(["jonesa", "smithj", "jonesa"])
+        self.assertEqual([a.family_name for a in authors], ["Jones", "Smith", "Jones"])
+        # One warning for all the authors, naming each once.
+        self.assertEqual(
+            stderr.getvalue(),
+            "WARNING: Unable to resolve email address for 2 author(s):\n"
+            "  jonesa email ''\n"
+            "  smithj email ''\n",
+        )
+
+        # Every problem is reported together.
+        with self.assertRaises(RuntimeError) as cm:
+            self.factory.get_authors(["smithj", "doej", "leek", "roej"])
+        self.assertIn("2 author(s) not found in author database: doej, roej", str(cm.exception))
+        self.assertIn("'leek' refers to unknown affiliation(s) MIT", str(cm.exception))
+
+    def test_render(self) -> None:
+        with contextlib.redirect_stderr(io.StringIO()):
+            authors = self.factory.get_authors(["smithj", "jonesa"] * 5)
+        for generator in (AASTeX7, Arxiv, ProcSpie, WebOfC, ASCOM, AAP):
+            with self.subTest(generator=generator.mode):
+                text = generator(authors).generate()
+                self.assertEqual(generator(authors, jobs=2).generate(), text)
+        # Formats that number authors by position render them in one go.
+        self.assertFalse(issubclass(LsstDoc, AuthorBlockGenerator))
+        self.assertFalse(hasattr(LsstDoc(authors), "render_authors"))
@@ -0,0 +1,647 @@
+import contextlib
+import io
+import os
+import pickle
+import sys
+import tempfile
+import time
+import types
+import unittest
+import unittest.mock
+
+import glossarytools
+from glossarytools import (
+    AcronymMatcher,
+    GlossaryIndex,
+    GlossaryStore,
+    GlsRewriter,
+    Watcher,
+    clean_tex_lines,
+    converge_glossary,
+    convert_tex_files,
+    discover_locales,
+    dump_gls,
+    expand_includes,
+    export_glossary,
+    export_search_index,
+    find_matches_stream,
+    find_matches_text,
+    is_nonstandard,
+    load_glossary_index,
+    main,
+    make_regexmap,
+    profile_report,
+    profile_tex_file,
+    prune_cache,
+    read_glossarydef,
+    read_manifest,
+    resolve_includes,
+    run_batch,
+    scan_tex_files,
+    sub_line,
+    updateFile,
+)
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), os.path.pardir, os.path.pardir, "examples")
+
+
+class TestAcronymMatcher(unittest.TestCase):
+    """Test the trie based acronym matcher."""
+
+    def setUp(self) -> None:
+        self.matcher = AcronymMatcher(["R&D", "R", "metric", "metric value", "LSST-DA", "DMS-REQ", "L#"])
+
+    def test_longest_match(self) -> None:
+        matches, remainder = self.matcher.scan("the metric value for R&D is R")
+        self.assertEqual(matches, {"metric value", "R&D", "R"})
+        self.assertEqual(remainder, "the  for  is ")
+
+    def test_word_boundaries(self) -> None:
+        # Terms inside longer words are not matched.
+        self.assertEqual(self.matcher.findall("metrics XR&D LSST-DAX"), set())
+        self.assertEqual(self.matcher.findall("(LSST-DA) DMS-REQ-0001"), {"LSST-DA", "DMS-REQ"})
+        # A term that ends in a non-word character needs a word after it.
+        self.assertEqual(self.matcher.findall("L# 1 L#2"), {"L#"})
+
+    def test_empty(self) -> None:
+        matcher = AcronymMatcher([])
+        self.assertEqual(matcher.scan("some text"), (set(), "some text"))
+
+
+class TestFindMatches(unittest.TestCase):
+    """Test matching of acronyms in text."""
+
+    def setUp(self) -> None:
+        self.enterContext(unittest.mock.patch.object(glossarytools, "doGlossary", False))
+        self.acronyms = {"LSST", "DM", "LSST-DA", "DA", "R&D"}
+
+    def test_matches_and_missing(self) -> None:
+        matches, missing = find_matches_text("LSST-DA and DM do R&D with XYZ", self.acronyms)
+        # DA is only seen as part of LSST-DA so is not a match.
+        self.assertEqual(matches, {"LSST-DA", "DM", "R&D"})
+        self.assertEqual(missing, {"XYZ"})
+
+    def test_known(self) -> None:
+        # Skipped terms are known so are not missing.
+        known = frozenset(self.acronyms | {"XYZ"})
+        text = "DM and XYZ with ABC"
+        self.assertEqual(find_matches_text(text, self.acronyms, known=known), ({"DM"}, {"ABC"}))
+        self.assertEqual(find_matches_stream([text], self.acronyms, known=known), ({"DM"}, {"ABC"}))
+
+    @unittest.mock.patch.object(glossarytools, "doGlossary", True)
+    def test_stream(self) -> None:
+        lines = [
+            "LSST-DA and DM do R&D\n",
+            "% a comment about XYZ\n",
+            "with ABC, \\gls{DA} and LSST-\n",
+            "DA R&D-LSST\n",
+        ] * 5
+        expected = find_matches_text(clean_tex_lines(lines), self.acronyms)
+        # Chunks small enough that terms and gls entries cross them.
+        for chunk_size in (1, 4, 9, 1000):
+            self.assertEqual(find_matches_stream(lines, self.acronyms, chunk_size=chunk_size), expected)
+
+
+class TestGlossaryStore(unittest.TestCase):
+    """Test the column store of glossary definitions."""
+
+    def setUp(self) -> None:
+        self.enterContext(unittest.mock.patch.object(glossarytools, "doGlossary", True))
+        rows = [
+            ["DM", "Data Management", "DM", "", "Data Management", "A"],
+            ["DM", "Dark Matter", "Sci", "", "", "A"],
+            ["Data Management", "The team", "DM Gen", "", "DM, DMS", "G"],
+            [],
+            ["SAL", "Service Abstraction Layer", "TS", "", "", "A"],
+            ["SAL", "Something Else", "OPS", "", "", "A"],
+        ]
+        self.store = GlossaryStore("test.csv", rows)
+
+    def test_indexes(self) -> None:
+        self.assertEqual(len(self.store), 6)
+        self.assertEqual(self.store.rows_for_term("DM"), [0, 1])
+        self.assertEqual(self.store.rows_with_tag("DM"), [0, 2])
+        self.assertEqual(self.store.rows_of_type("G"), [2])
+        self.assertEqual(self.store.rows_for_alternative("DMS"), [2])
+        self.assertEqual(self.store.lines[4], 6)
+        self.assertEqual(self.store.widths[3], 0)
+
+    def test_select(self) -> None:
+        # The first definition is used unless a later one is tagged.
+        self.assertEqual(self.store.select(set())["DM"], {("Data Management", "A")})
+        self.assertEqual(self.store.select({"Sci"})["DM"], {("Dark Matter", "A")})
+        self.assertEqual(self.store.select({"TS", "OPS"})["SAL"], {("Something Else", "A")})
+        self.assertNotIn("Data Management", self.store.select(set(), glossary=False))
+        init = {"SAL": {("Local", "A")}}
+        self.assertEqual(self.store.select(set(), init=init)["SAL"], {("Local", "A")})
+        self.assertEqual(self.store.select({"TS"}, init=init)["SAL"], {("Service Abstraction Layer", "A")})
+
+    def test_too_few_columns(self) -> None:
+        with self.assertRaises(ValueError):
+            GlossaryStore("test.csv", [["DM", "Data Management", "DM"]])
+
+    def test_load(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filename = os.path.join(tmpdir, "glossarydefs.csv")
+            with open(filename, "w") as fd:
+                fd.write("Term,Description,Subsystem Tags,Documentation Tags,Alternatives,Type\n")
+                fd.write("DM,Data Management,DM,,,A\n")
+            store = GlossaryStore.load(filename)
+            self.assertIs(GlossaryStore.load(filename), store)
+            self.assertEqual(read_glossarydef(filename, None), {"DM": {("Data Management", "A")}})
+            # A changed file is read again.
+            with open(filename, "a") as fd:
+                fd.write("LSST,Legacy Survey of Space and Time,Gen,,,A\n")
+            self.assertEqual(len(GlossaryStore.load(filename)), 2)
+
+
+class TestDumpGls(unittest.TestCase):
+    """Test writing the full glossary with translations."""
+
+    def setUp(self) -> None:
+        self.cwd = os.getcwd()
+        self.tmpdir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmpdir.name)
+        self.filename = os.path.join(self.tmpdir.name, "defs.csv")
+        with open(self.filename, "w") as fd:
+            fd.write("Term,Description,Subsystem Tags,Documentation Tags,Alternatives,Type\n")
+            fd.write("DM,Data Management,DM,,,A\n")
+            fd.write("DM,Dark Matter,Sci,,,A\n")
+            fd.write("R&D,Research and Development,Gen,,,A\n")
+
+    def tearDown(self) -> None:
+        os.chdir(self.cwd)
+        self.tmpdir.cleanup()
+
+    def write_translation(self, locale: str, rows: list[str]) -> None:
+        with open(os.path.join(self.tmpdir.name, f"defs_{locale}.csv"), "w") as fd:
+            fd.write("English,Translation,Subsystem Tags\n")
+            fd.write("".join(f"{row}\n" for row in rows))
+
+    def test_locales(self) -> None:
+        self.write_translation("es", ["DM,Gestion de Datos,DM", "DM,Materia Oscura,Sci"])
+        self.write_translation("fr", ["R\\&D,Recherche,"])
+        self.assertEqual(dump_gls(self.filename, "table.tex", ["es", "fr"]), 4)
+        with open("table.tex") as fd:
+            table = fd.read()
+        self.assertIn("DM & Data Management\n\nGestion de Datos & DM \\\\\n", table)
+        self.assertIn("R\\&D & Research and Development\n\nRecherche & Gen \\\\\n", table)
+        with open("htmlglossary.csv") as fd:
+            self.assertEqual(len(fd.readlines()), 6)
+        with open("fullgls.tex") as fd:
+            self.assertEqual(fd.read(), "\\gls{DM}\n\\gls{DM}\n")
+
+    def test_export(self) -> None:
+        self.write_translation("es", ["DM,Gestion de Datos,DM", "DM,Materia Oscura,Sci", "XYZ,Desconocido,"])
+        self.write_translation("fr", ["R\\&D,Recherche,"])
+        self.assertEqual(discover_locales(self.filename), ["es", "fr"])
+        coverage = export_glossary(self.filename, "out")
+        self.assertEqual(
+            [(c.locale, c.translated, c.total, c.unused) for c in coverage],
+            [("es", 2, 3, 1), ("fr", 1, 3, 0)],
+        )
+        self.assertAlmostEqual(coverage[1].percent, 100 / 3)
+        self.assertEqual(
+            sorted(os.listdir("out")),
+            [
+                "fullgls.tex",
+                "glossary_es.tex",
+                "glossary_fr.tex",
+                "htmlglossary_es.csv",
+                "htmlglossary_fr.csv",
+            ],
+        )
+        with open(os.path.join("out", "glossary_fr.tex")) as fd:
+            self.assertNotIn("Gestion", fd.read())
+
+    def test_search_index(self) -> None:
+        import json
+
+        self.write_translation("es", ["DM,Gestión de Datos,DM", "DM,Materia Oscura,Sci"])
+        stats = export_search_index(self.filename, "index")
+        self.assertEqual(stats["entries"], 3)
+        with open(os.path.join("index", "manifest.json")) as fd:
+            manifest = json.load(fd)
+        self.assertEqual(manifest["fields"][-1], "es")
+        self.assertEqual(sorted(manifest["shards"]), ["a", "d", "m", "r"])
+        with open(os.path.join("index", "index", "d.json")) as fd:
+            words = json.load(fd)
+        # Words are in lower case and found in the terms and definitions.
+        self.assertEqual(words["dm"], ["d0", "d1"])
+        self.assertEqual(words["dark"], ["d1"])
+        self.assertEqual(words["development"], ["r0"])
+        with open(os.path.join("index", "entries", "d.json")) as fd:
+            entries = json.load(fd)
+        self.assertEqual(entries[1][:2], ["DM", "Dark Matter"])
+        self.assertEqual(entries[0][-1], "Gestión de Datos")
+
+    def test_errors(self) -> None:
+        # Both the missing tag and the duplicate are reported.
+        rows = ["DM,Gestion de Datos,DM", "DM,Materia Oscura,Gen", "R\\&D,A,", "R\\&D,B,"]
+        self.write_translation("es", rows)
+        with self.assertRaises(ValueError) as cm:
+            dump_gls(self.filename, "table.tex")
+        self.assertIn("2 problems", str(cm.exception))
+        self.assertFalse(os.path.exists("table.tex"))
+
+    def test_short_rows(self) -> None:
+        with open(self.filename, "a") as fd:
+            fd.write("TS,Telescope and Site,TS\n")
+            fd.write("\n")
+            fd.write("OPS,Operations\n")
+        self.write_translation("es", ["DM,Gestion de Datos,DM", "DM,Materia Oscura,Sci"])
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout), self.assertRaises(ValueError) as cm:
+            dump_gls(self.filename, "table.tex")
+        # Every short row is reported, not just the first.
+        self.assertIn("3 problems", str(cm.exception))
+        self.assertIn("line 5 - Too few columns.", stdout.getvalue())
+        self.assertIn("line 7 - Too few columns.", stdout.getvalue())
+
+
+class TestGlossaryIndex(unittest.TestCase):
+    """Test loading and caching of the glossary index."""
+
+    @unittest.mock.patch.object(glossarytools, "doGlossary", True)
+    def test_cache(self) -> None:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            index = load_glossary_index({"DM"}, cache_dir=cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 1)
+            cached = load_glossary_index({"DM"}, cache_dir=cache_dir)
+            self.assertEqual(cached.lsst_definitions, index.lsst_definitions)
+            self.assertEqual(cached.matcher.terms, index.matcher.terms)
+            # A different tag set is a different index.
+            load_glossary_index({"OPS"}, cache_dir=cache_dir)
+            self.assertEqual(len(os.listdir(cache_dir)), 2)
+
+    def test_prune(self) -> None:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            for age, name in enumerate(["new", "used", "old", "older"]):
+                path = os.path.join(cache_dir, f"{name}.pickle")
+                with open(path, "wb") as fd:
+                    pickle.dump(b"x" * 90, fd)
+                os.utime(path, (1000 - age, 1000 - age))
+            with open(os.path.join(cache_dir, "notes.txt"), "w") as fd:
+                fd.write("Not a cache entry\n")
+            # Reading an entry makes it recent.
+            glossarytools._read_cache(cache_dir, "older")
+            self.assertEqual(prune_cache(cache_dir, 250), 2)
+            self.assertEqual(sorted(os.listdir(cache_dir)), ["new.pickle", "notes.txt", "older.pickle"])
+
+            # Writing prunes the cache.
+            glossarytools._cache_unpruned.pop(cache_dir, None)
+            with unittest.mock.patch.object(glossarytools, "CACHE_MAX_BYTES", 150):
+                glossarytools._write_cache(cache_dir, "newest", "value")
+            self.assertEqual(sorted(os.listdir(cache_dir)), ["newest.pickle", "notes.txt", "older.pickle"])
+
+
+class TestScanTexFiles(unittest.TestCase):
+    """Test scanning of tex files."""
+
+    @unittest.mock.patch.object(glossarytools, "doGlossary", True)
+    def test_parallel(self) -> None:
+        index = load_glossary_index(set())
+        texfiles = sorted(os.path.join(EXAMPLES, f) for f in os.listdir(EXAMPLES) if f.endswith(".tex"))
+        serial = scan_tex_files(texfiles, index)
+        parallel = scan_tex_files(texfiles, index, jobs=2)
+        self.assertEqual([s.filename for s in parallel], texfiles)
+        self.assertEqual([(s.matches, s.missing) for s in parallel], [(s.matches, s.missing) for s in serial])
+
+    @unittest.mock.patch.object(glossarytools, "doGlossary", True)
+    def test_cache(self) -> None:
+        index = load_glossary_index(set())
+        texfiles = [os.path.join(EXAMPLES, "DMTN-nnn.tex"), os.path.join(EXAMPLES, "LDM-nnn.tex")]
+        with tempfile.TemporaryDirectory() as cache_dir:
+            first = scan_tex_files(texfiles, index, cache_dir=cache_dir)
+            second = scan_tex_files(texfiles, index, cache_dir=cache_dir)
+        self.assertEqual([s.cached for s in first], [False, False])
+        self.assertEqual([s.cached for s in second], [True, True])
+        self.assertEqual([(s.matches, s.missing) for s in second], [(s.matches, s.missing) for s in first])
+
+    @unittest.mock.patch.object(glossarytools, "doGlossary", True)
+    def test_profile(self) -> None:
+        index = load_glossary_index(set())
+        texfile = os.path.join(EXAMPLES, "DMTN-nnn.tex")
+        (scan,) = scan_tex_files([texfile], index)
+        profile = profile_tex_file(texfile, index.acronyms, index.matcher)
+        report = profile_report([profile], {}, index.acronyms, set())
+        # The profile explains exactly what the scan found.
+        self.assertEqual({t for t, i in report["terms"].items() if i["status"] == "defined"}, scan.matches)
+        self.assertEqual({t for t, i in report["terms"].items() if i["status"] == "missing"}, scan.missing)
+        with open(texfile) as fd:
+            lines = fd.readlines()
+        for term, _, line in profile.sources:
+            self.assertIn(term, lines[line - 1])
+        self.assertEqual(report["terms"]["Data Management"]["pass"], "nonstandard")
+        self.assertEqual(report["terms"]["XXX"]["sources"], [[texfile, 65, "CAP_ACRONYM"]])
+
+
+class TestPandoc(unittest.TestCase):
+    """Test converting tex files with a stand-in for pypandoc."""
+
+    def setUp(self) -> None:
+        self.converted: list[str] = []
+
+        def convert_file(filename: str, to: str, format: str) -> str:
+            # The first file finishes last.
+            time.sleep(0.05 if filename.endswith("a.tex") else 0)
+            self.converted.append(os.path.basename(filename))
+            with open(filename) as fd:
+                return f"{to} of {fd.read()}"
+
+        pypandoc = types.SimpleNamespace(
+            get_pandoc_path=lambda: "/usr/bin/pandoc",
+            get_pandoc_version=lambda: "3.0",
+            convert_file=convert_file,
+        )
+        self.enterContext(unittest.mock.patch.dict(sys.modules, {"pypandoc": pypandoc}))
+        self.enterContext(unittest.mock.patch.object(glossarytools, "USE_PANDOC", True))
+        glossarytools._probe_pypandoc.cache_clear()
+        self.addCleanup(glossarytools._probe_pypandoc.cache_clear)
+        self.tmpdir = self.enterContext(tempfile.TemporaryDirectory())
+        self.texfiles = [os.path.join(self.tmpdir, f"{name}.tex") for name in "abc"]
+        for filename, text in zip(self.texfiles, ["The DM team", "The LSST survey", "No terms"], strict=True):
+            with open(filename, "w") as fd:
+                fd.write(text)
+
+    def test_convert(self) -> None:
+        cache_dir = os.path.join(self.tmpdir, "cache")
+        texts = convert_tex_files(self.texfiles, cache_dir, jobs=3)
+        self.assertEqual(list(texts), self.texfiles)
+        self.assertEqual(
+            list(texts.values()),
+            ["markdown of The DM team", "markdown of The LSST survey", "markdown of No terms"],
+        )
+        self.assertEqual(self.converted[-1], "a.tex")
+
+        # Only the changed file is converted again.
+        self.converted.clear()
+        with open(self.texfiles[1], "w") as fd:
+            fd.write("The Rubin survey")
+        texts = convert_tex_files(self.texfiles, cache_dir, jobs=3)
+        self.assertEqual(self.converted, ["b.tex"])
+        self.assertEqual(texts[self.texfiles[1]], "markdown of The Rubin survey")
+        self.assertEqual(texts[self.texfiles[0]], "markdown of The DM team")
+
+    @unittest.mock.patch.object(glossarytools, "doGlossary", False)
+    def test_scan(self) -> None:
+        index = load_glossary_index(set())
+        scans = scan_tex_files(self.texfiles, index)
+        self.assertEqual([s.filename for s in scans], self.texfiles)
+        self.assertIn("DM", scans[0].matches)
+        self.assertIn("LSST", scans[1].matches)
+        self.assertEqual(sorted(self.converted), ["a.tex", "b.tex", "c.tex"])
+
+
+class TestIncludes(unittest.TestCase):
+    """Test following the files included by a document."""
+
+    def test_resolve(self) -> None:
+        files = {
+            "main.tex": "\\input{a}\n\\include{sub/b}\n% \\input{c}\n\\subfile{sub/s}\n\\input{aglossary}\n",
+            "a.tex": "\\input{a}\\input{shared.tex} \\input{nothere}\n",
+            "sub/b.tex": "\\input{shared}\n",
+            "sub/s.tex": "\\subfile{t}\n",
+            "sub/t.tex": "Text\n",
+            "shared.tex": "DM\n",
+            "c.tex": "",
+        }
+        with tempfile.TemporaryDirectory() as tmpdir, tempfile.TemporaryDirectory() as cache_dir:
+            os.mkdir(os.path.join(tmpdir, "sub"))
+            for name, content in files.items():
+                with open(os.path.join(tmpdir, name), "w") as fd:
+                    fd.write(content)
+            root = os.path.join(tmpdir, "main.tex")
+            graph = resolve_includes(root, cache_dir)
+            names = ["main.tex", "a.tex", "shared.tex", "sub/b.tex", "sub/s.tex", "sub/t.tex"]
+            self.assertEqual(graph.files, [os.path.join(tmpdir, f) for f in names])
+            self.assertEqual(graph.missing, ["nothere"])
+            self.assertEqual(resolve_includes(root, cache_dir), graph)
+
+            # Adding a missing file invalidates the cache.
+            with open(os.path.join(tmpdir, "nothere.tex"), "w") as fd:
+                fd.write("\\input{c}\n")
+            graph = resolve_includes(root, cache_dir)
+            self.assertEqual(graph.missing, [])
+            names[3:3] = ["nothere.tex", "c.tex"]
+            self.assertEqual(graph.files, [os.path.join(tmpdir, f) for f in names])
+            self.assertEqual(expand_includes([root, os.path.join(tmpdir, "a.tex")]), graph.files)
+
+
+class TestBatch(unittest.TestCase):
+    """Test processing many documents in one run."""
+
+    def test_batch(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for name, texfile in (("a", "DMTN-nnn.tex"), ("b", "LDM-nnn.tex")):
+                os.mkdir(os.path.join(tmpdir, name))
+                with (
+                    open(os.path.join(EXAMPLES, texfile)) as fd,
+                    open(os.path.join(tmpdir, name, texfile), "w") as out,
+                ):
+                    out.write(fd.read())
+            with open(os.path.join(tmpdir, "b", "myacronyms.txt"), "w") as fd:
+                fd.write("LDM:My definition\n")
+            manifest = os.path.join(tmpdir, "manifest.yaml")
+            with open(manifest, "w") as fd:
+                fd.write("defaults:\n  tags: DM\ndocuments:\n  - a\n  - dir: b\n    glossary: true\n")
+
+            documents = read_manifest(manifest)
+            self.assertEqual([d.dir for d in documents], [os.path.join(tmpdir, d) for d in "ab"])
+            self.assertEqual(documents[1].utags(), {"DM"})
+            self.assertEqual(documents[0].texfiles(), ["DMTN-nnn.tex"])
+
+            self.assertEqual(run_batch(documents), 0)
+            self.assertTrue(os.path.exists(os.path.join(tmpdir, "a", "acronyms.tex")))
+            with open(os.path.join(tmpdir, "b", "aglossary.tex")) as fd:
+                self.assertIn("My definition", fd.read())
+            # Generated files are not scanned on a second run.
+            self.assertEqual(documents[0].texfiles(), ["DMTN-nnn.tex"])
+
+    def test_bad_manifest(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            manifest = os.path.join(tmpdir, "manifest.yaml")
+            with open(manifest, "w") as fd:
+                fd.write("documents:\n  - dir: a\n    colour: red\n")
+            with self.assertRaises(ValueError):
+                read_manifest(manifest)
+
+
+class TestWatcher(unittest.TestCase):
+    """Test regenerating the acronyms as files change."""
+
+    @unittest.mock.patch.object(glossarytools, "doGlossary", False)
+    def test_poll(self) -> None:
+        cwd = os.getcwd()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            os.chdir(tmpdir)
+            try:
+                with open("a.tex", "w") as fd:
+                    fd.write("The DM team\n")
+                with open("b.tex", "w") as fd:
+                    fd.write("The LSST survey\n")
+                watcher = Watcher(["a.tex", "b.tex"], False, set(), True, False, False, "tex", True)
+                self.assertTrue(watcher.poll())
+                with open("acronyms.tex") as fd:
+                    self.assertIn("LSST", fd.read())
+                # Nothing changed.
+                self.assertFalse(watcher.poll())
+                # A change that does not alter the entries.
+                with open("a.tex", "a") as fd:
+                    fd.write("More about DM\n")
+                self.assertFalse(watcher.poll())
+                with open("b.tex", "w") as fd:
+                    fd.write("No survey\n")
+                self.assertTrue(watcher.poll())
+                with open("acronyms.tex") as fd:
+                    self.assertNotIn("LSST", fd.read())
+                # Local definitions are picked up.
+                with open("myacronyms.txt", "w") as fd:
+                    fd.write("DM:Local definition\n")
+                self.assertTrue(watcher.poll())
+                with open("acronyms.tex") as fd:
+                    self.assertIn("Local definition", fd.read())
+                # A failing change is tried again until it is fixed.
+                with open("myacronyms.txt", "w") as fd:
+                    fd.write("DM:Local definition\nDM:Another definition\n")
+                with contextlib.redirect_stdout(io.StringIO()):
+                    for _ in range(2):
+                        with self.assertRaises(RuntimeError):
+                            watcher.poll()
+                with open("myacronyms.txt", "w") as fd:
+                    fd.write("DM:Fixed definition\n")
+                self.assertTrue(watcher.poll())
+                with open("acronyms.tex") as fd:
+                    self.assertIn("Fixed definition", fd.read())
+            finally:
+                os.chdir(cwd)
+
+    def test_run(self) -> None:
+        watcher = Watcher(["a.tex"], False, set(), True, False, False, "tex", True)
+        stderr = io.StringIO()
+        with (
+            unittest.mock.patch.object(watcher, "poll", side_effect=[RuntimeError("Bad file"), True]) as poll,
+            unittest.mock.patch("time.sleep", side_effect=[None, KeyboardInterrupt]),
+            contextlib.redirect_stderr(stderr),
+        ):
+            watcher.run()
+        # Watching carried on after the error.
+        self.assertEqual(poll.call_count, 2)
+        self.assertIn("Error: Bad file", stderr.getvalue())
+
+
+class TestGlsRewriter(unittest.TestCase):
+    """Test adding gls to lines of tex."""
+
+    def test_same_as_sub_line(self) -> None:
+        GLSlist = ["DM", "Data Management", "LSST", "R&D", "A.B"]
+        lines = [
+            "The DM team\n",
+            "(Data Management) and LSST\n",
+            "See \\cite{LSST} for DM\n",
+            "Already \\gls{DM} and DM here\n",
+            "XDM, DMX and -R&D, A-B\n",
+            "DM at the start\n",
+        ]
+        rewriter = GlsRewriter(GLSlist)
+        regexmap = make_regexmap(GLSlist)
+        for line in lines:
+            self.assertEqual(rewriter.sub_line(line), sub_line(line, regexmap, GLSlist), line)
+
+
+class TestUpdateFile(unittest.TestCase):
+    """Test adding gls to tex files."""
+
+    def test_update(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            changed = os.path.join(tmpdir, "changed.tex")
+            unchanged = os.path.join(tmpdir, "unchanged.tex")
+            with open(changed, "w") as fd:
+                fd.write("\\section{DM}\nThe DM team\n")
+            with open(unchanged, "w") as fd:
+                fd.write("Nothing to see\n")
+
+            result = updateFile(changed, {"DM"}, diff=True)
+            self.assertTrue(result.changed)
+            self.assertIn("+The \\gls{DM} team", result.diff)
+            self.assertFalse(os.path.exists(changed + ".old"))
+
+            self.assertTrue(updateFile(changed, {"DM"}).changed)
+            with open(changed) as fd:
+                self.assertEqual(fd.read(), "\\section{DM}\nThe \\gls{DM} team\n")
+            self.assertTrue(os.path.exists(os.path.join(tmpdir, "changed.tex.old")))
+
+            self.assertFalse(updateFile(unchanged, {"DM"}).changed)
+            self.assertEqual(sorted(os.listdir(tmpdir)), ["changed.tex", "changed.tex.old", "unchanged.tex"])
+
+    def test_interrupted(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            texfile = os.path.join(tmpdir, "doc.tex")
+            with open(texfile, "w") as fd:
+                fd.write("The DM team\n")
+            with unittest.mock.patch.object(os, "replace", side_effect=KeyboardInterrupt):
+                with self.assertRaises(KeyboardInterrupt):
+                    updateFile(texfile, {"DM"})
+            with open(texfile) as fd:
+                self.assertEqual(fd.read(), "The DM team\n")
+            # The temporary file is removed and only the backup is left.
+            self.assertEqual(sorted(os.listdir(tmpdir)), ["doc.tex", "doc.tex.old"])
+
+
+class TestConvergeGlossary(unittest.TestCase):
+    """Test finding entries referenced by other entries."""
+
+    @unittest.mock.patch.object(glossarytools, "doGlossary", True)
+    def test_converge(self) -> None:
+        definitions = {
+            "DM": {("Data Management", "A")},
+            "Data Management": {("The part of Rubin that writes the DMS", "G")},
+            "DMS": {("Data Management System", "A")},
+            "Data Management System": {("Software and hardware", "G")},
+            "XYZ": {("Unused", "A")},
+        }
+        index = GlossaryIndex(
+            definitions,
+            {},
+            set(),
+            set(definitions),
+            AcronymMatcher(a for a in definitions if is_nonstandard(a)),
+            frozenset(definitions),
+            "test",
+        )
+        results, rounds = converge_glossary({"DM"}, index, noadorn=True)
+        self.assertEqual(
+            [acr for acr, _ in results], ["DM", "DMS", "Data Management", "Data Management System"]
+        )
+        self.assertEqual(rounds, 4)
+
+
+class TestMain(unittest.TestCase):
+    """Test running from the command line."""
+
+    def setUp(self) -> None:
+        self.enterContext(unittest.mock.patch.object(glossarytools, "doGlossary", False))
+        cwd = os.getcwd()
+        tmpdir = self.enterContext(tempfile.TemporaryDirectory())
+        os.chdir(tmpdir)
+        self.addCleanup(os.chdir, cwd)
+        with open("doc.tex", "w") as fd:
+            fd.write("The DM team\n")
+
+    def test_bad_arguments(self) -> None:
+        for argv in ([], ["--diff", "doc.tex"], ["--watch", "-u", "doc.tex"]):
+            with self.subTest(argv=argv):
+                with contextlib.redirect_stderr(io.StringIO()), self.assertRaises(SystemExit) as cm:
+                    main(argv)
+                self.assertEqual(cm.exception.code, 2)
+
+    def test_glossary(self) -> None:
+        with contextlib.redirect_stdout(io.StringIO()), contextlib.redirect_stderr(io.StringIO()):
+            self.assertEqual(main(["-g", "--no-cache", "doc.tex"]), 0)
+        self.assertTrue(glossarytools.doGlossary)
+        with open("aglossary.tex") as fd:
+            self.assertIn("Data Management", fd.read())
+
+
+if __name__ == "__main__":
+    unittest.main()
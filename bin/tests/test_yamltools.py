@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+
+import yaml
+from yamltools import dump_yaml, load_yaml, load_yaml_snapshot, snapshot_path
+
+AUTHORDB = os.path.join(os.path.dirname(__file__), os.path.pardir, os.path.pardir, "etc", "authordb.yaml")
+
+
+class TestYamlTools(unittest.TestCase):
+    """Test reading and writing YAML."""
+
+    def test_authordb(self) -> None:
+        with open(AUTHORDB) as fd:
+            content = fd.read()
+        data = load_yaml(content)
+        self.assertEqual(data, yaml.safe_load(content))
+        # The database is written out unchanged, as the Python emitter would.
+        self.assertEqual(dump_yaml(data, allow_unicode=True), content)
+        self.assertEqual(dump_yaml(data, allow_unicode=True), yaml.safe_dump(data, allow_unicode=True))
+
+    def test_dump(self) -> None:
+        long = "Karl-Schwarzschild-Strasse 2, 85748 Garching bei München, Germany " * 3
+        for data in (
+            {"b": ["one", 2, None, True], "a": {"x": 1.5}},
+            {"address": long},
+            {"address": long + "\t"},
+            {"address": long + "\U0001f52d"},
+            {"": "empty key"},
+            ["multiple\nlines", "  padded  "],
+        ):
+            for allow_unicode in (False, True):
+                for sort_keys in (False, True):
+                    with self.subTest(data=data, allow_unicode=allow_unicode, sort_keys=sort_keys):
+                        text = dump_yaml(data, allow_unicode=allow_unicode, sort_keys=sort_keys)
+                        self.assertEqual(
+                            text, yaml.safe_dump(data, allow_unicode=allow_unicode, sort_keys=sort_keys)
+                        )
+                        assert text is not None
+                        self.assertEqual(load_yaml(text), data)
+
+
+class TestSnapshot(unittest.TestCase):
+    """Test loading YAML through a snapshot."""
+
+    def test_snapshot(self) -> None:
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "db.yaml")
+            with open(path, "w") as fd:
+                fd.write("authors:\n  smithj: {family_name: Smith}\n")
+            data = load_yaml_snapshot(path)
+            self.assertEqual(data, {"authors": {"smithj": {"family_name": "Smith"}}})
+            self.assertTrue(os.path.exists(snapshot_path(path)))
+            self.assertEqual(load_yaml_snapshot(path, "names", lambda d: sorted(d["authors"])), ["smithj"])
+
+            def fail(data: object) -> None:
+                raise AssertionError("Snapshot not used")
+
+            # Both kinds come from the snapshot while the file is unchanged.
+            self.assertEqual(load_yaml_snapshot(path, "data", fail), data)
+            self.assertEqual(load_yaml_snapshot(path, "names", fail), ["smithj"])
+
+            with open(path, "w") as fd:
+                fd.write("authors: {}\n")
+            self.assertEqual(load_yaml_snapshot(path, "names", lambda d: sorted(d["authors"])), [])
+
+            # A broken snapshot is replaced.
+            with open(snapshot_path(path), "w") as fd:
+                fd.write("junk")
+            self.assertEqual(load_yaml_snapshot(path), {"authors": {}})
+            self.assertEqual(load_yaml_snapshot(path, "data", fail), {"authors": {}})
@@ -3,8 +3,8 @@
 
 import subprocess
 
-import yaml
 from authordb import AuthorDbYaml, load_authordb
+from yamltools import dump_yaml
 
 
 def make_all(authordb: AuthorDbYaml) -> None:
@@ -13,7 +13,7 @@ def make_all(authordb: AuthorDbYaml) -> None:
     for a in authordb.authors:
         allauthors.append(a)
     with open("authors.yaml", "w") as file:
-        yaml.dump(allauthors, file)
+        dump_yaml(allauthors, file)
 
 
 def main() -> None:
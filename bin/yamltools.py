@@ -0,0 +1,172 @@
+"""Read and write YAML files with libyaml when PyYAML was built with it.
+
+The libyaml loader and emitter are several times faster than the pure
+Python ones but the emitter does not lay out every scalar the same way:
+it folds long double-quoted strings at different places, escapes
+characters outside the Basic Multilingual Plane and writes empty keys
+differently. `dump_yaml` therefore only uses it when every string in the
+data can be written unquoted or single-quoted, where the two emitters
+agree, so that files such as :file:`etc/authordb.yaml` come out byte for
+byte as they always have.
+
+`load_yaml_snapshot` keeps a pickle of a parsed file next to it so that
+large files such as the author database need not be parsed again until
+they change.
+"""
+
+import os
+import re
+from collections.abc import Callable
+from typing import IO, Any
+
+import yaml
+
+__all__ = ["SafeDumper", "SafeLoader", "dump_yaml", "load_yaml", "load_yaml_snapshot", "snapshot_path"]
+
+SafeLoader: type = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+SafeDumper: type = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+# Strings made only of these characters are never double-quoted, keyed on
+# allow_unicode. Empty keys are checked for separately.
+_PLAIN_STRING = {
+    True: re.compile("[\x20-\x7e\xa0-\u2027\u202a-\ud7ff\ue000-\ufefe\uff00-\ufffd]*"),
+    False: re.compile("[\x20-\x7e]*"),
+}
+
+
+def load_yaml(stream: str | bytes | IO[Any]) -> Any:
+    """Parse a YAML document as `yaml.safe_load` does.
+
+    Parameters
+    ----------
+    stream : `str`, `bytes` or file-like
+        The document, or an open file to read it from.
+
+    Returns
+    -------
+    data : `typing.Any`
+        The data in the document.
+    """
+    return yaml.load(stream, Loader=SafeLoader)
+
+
+def _same_in_libyaml(data: Any, allow_unicode: bool) -> bool:
+    """Return whether the libyaml emitter writes ``data`` as the Python one
+    does.
+    """
+    plain = _PLAIN_STRING[allow_unicode].fullmatch
+    todo = [data]
+    while todo:
+        item = todo.pop()
+        if isinstance(item, str):
+            if not plain(item):
+                return False
+        elif isinstance(item, dict):
+            if "" in item:
+                return False
+            todo.extend(item)
+            todo.extend(item.values())
+        elif isinstance(item, list | tuple | set):
+            todo.extend(item)
+    return True
+
+
+def dump_yaml(
+    data: Any, stream: IO[str] | None = None, allow_unicode: bool = False, sort_keys: bool = True
+) -> str | None:
+    """Write data as YAML as `yaml.safe_dump` does.
+
+    Parameters
+    ----------
+    data : `typing.Any`
+        The data to write.
+    stream : file-like, optional
+        Where to write the YAML. If not given it is returned instead.
+    allow_unicode : `bool`, optional
+        Write characters outside ASCII as they are rather than escaping
+        them.
+    sort_keys : `bool`, optional
+        Sort the keys of mappings.
+
+    Returns
+    -------
+    yaml : `str` or `None`
+        The YAML, if no stream was given.
+    """
+    dumper = SafeDumper if _same_in_libyaml(data, allow_unicode) else yaml.SafeDumper
+    return yaml.dump(data, stream, Dumper=dumper, allow_unicode=allow_unicode, sort_keys=sort_keys)
+
+
+# Increment when the format of snapshots changes.
+SNAPSHOT_VERSION = 1
+
+
+def snapshot_path(path: str) -> str:
+    """Return the path of the snapshot of a YAML file, a hidden file next
+    to it.
+    """
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f".{name}.pickle")
+
+
+def load_yaml_snapshot(path: str, kind: str = "data", build: Callable[[Any], Any] | None = None) -> Any:
+    """Load a YAML file, using a snapshot of it when the file is unchanged.
+
+    Parsing a large YAML file, and validating it, takes much longer than
+    reading back a pickle of the result. The snapshot is stored next to the
+    YAML file, keyed on a hash of its content, and rebuilt whenever that
+    changes. If the snapshot can not be read or written the YAML file is
+    used directly.
+
+    Parameters
+    ----------
+    path : `str`
+        Path to the YAML file.
+    kind : `str`, optional
+        Name for what ``build`` returns. One snapshot can hold several
+        kinds, all derived from the same content. The name should change
+        whenever ``build`` does.
+    build : `~collections.abc.Callable`, optional
+        Function converting the parsed YAML into the object to return. The
+        parsed YAML itself is returned if not given.
+
+    Returns
+    -------
+    value : `~typing.Any`
+        The parsed and built content of the file.
+    """
+    import hashlib
+    import pickle
+
+    with open(path, "rb") as fd:
+        content = fd.read()
+    digest = hashlib.sha256(content).hexdigest()
+    snapshot_file = snapshot_path(path)
+
+    snapshot: dict[str, Any] = {}
+    try:
+        with open(snapshot_file, "rb") as fd:
+            stored = pickle.load(fd)
+        if stored.get("version") == SNAPSHOT_VERSION and stored.get("digest") == digest:
+            snapshot = stored
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ImportError, TypeError):
+        pass
+    if kind in snapshot:
+        return snapshot[kind]
+
+    if "data" not in snapshot:
+        snapshot = {"version": SNAPSHOT_VERSION, "digest": digest, "data": load_yaml(content)}
+    value = snapshot[kind] = snapshot["data"] if build is None else build(snapshot["data"])
+
+    import tempfile
+
+    try:
+        with tempfile.NamedTemporaryFile("wb", dir=os.path.dirname(snapshot_file), delete=False) as out:
+            pickle.dump(snapshot, out, protocol=pickle.HIGHEST_PROTOCOL)
+        # Readable by anyone who can read the YAML file.
+        os.chmod(out.name, 0o644)
+        os.replace(out.name, snapshot_file)
+    except (OSError, pickle.PicklingError):
+        # The YAML file is used again next time.
+        pass
+    return value